@@ -0,0 +1,65 @@
+from decimal import Decimal
+from time import perf_counter
+from typing import Any, Dict
+
+from boto3.dynamodb.conditions import Attr
+
+from logger import MyLogger
+from logger.borg_default import BorgDefaultFunctions
+from models.article import Article, StateArticle
+
+SIZE = 20000
+REPEAT = 5
+CUSTOM_FUNCTIONS = 8
+
+logger = MyLogger(__name__)
+
+
+class Custom(object):
+    def __init__(self, value: int):
+        self.value = value
+
+
+def create_samples() -> Dict[str, Any]:
+    return {
+        "Article": Article(
+            url="https://e-hentai.org/g/2330808/37cfac63e0/",
+            status=StateArticle.Inserted,
+        ),
+        "Decimal": Decimal("1641712642123"),
+        "bytes": b"bytes",
+        "Condition": Attr("url").eq("a"),
+        "Custom": Custom(1),
+    }
+
+
+def measure(obj: Any) -> float:
+    default = BorgDefaultFunctions().default
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = perf_counter()
+        for _ in range(SIZE):
+            default(obj)
+        best = min(best, perf_counter() - start)
+    return best / SIZE
+
+
+def main():
+    # The last legacy function is the only one that accepts Custom.
+    for i in range(CUSTOM_FUNCTIONS - 1):
+        logger.add_default_function(lambda x, i=i: (False, None))
+    logger.add_default_function(
+        lambda x: (True, x.value) if isinstance(x, Custom) else (False, None)
+    )
+
+    samples = create_samples()
+    print(f"{'type':<12}{'ns/object':>11}")
+    for name, obj in samples.items():
+        print(f"{name:<12}{measure(obj) * 1e9:>11.0f}")
+    if hasattr(logger, "register_default_function"):
+        logger.register_default_function(Custom, lambda x: x.value)
+        print(f"{'Custom(reg)':<12}{measure(samples['Custom']) * 1e9:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
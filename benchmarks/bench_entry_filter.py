@@ -0,0 +1,55 @@
+from time import perf_counter
+from typing import Callable, List
+
+from synthetic_feed import generate_items
+
+import handlers.get_feed as index
+from models.entry import EntryFilter, EntrySummary
+
+SIZE = 10000
+REPEAT = 5
+
+
+def filter_functions(items: List[dict]) -> List[EntrySummary]:
+    return [
+        EntrySummary(**x)
+        for x in items
+        if index.is_target_category(x["title"])
+        and not index.has_foreigner_language_tag(x["summary"])
+    ]
+
+
+def filter_engine(engine: EntryFilter) -> Callable[[List[dict]], List[EntrySummary]]:
+    def process(items: List[dict]) -> List[EntrySummary]:
+        return engine.filter([EntrySummary(**x) for x in items])
+
+    return process
+
+
+def measure(func: Callable[[List[dict]], List[EntrySummary]], items: List[dict]):
+    best = float("inf")
+    result: List[EntrySummary] = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        result = func(items)
+        best = min(best, perf_counter() - start)
+    return best, result
+
+
+def main():
+    items = generate_items(SIZE)
+    engine = EntryFilter(index.DEFAULT_FILTER_RULES)
+    print(f"{'filter':<12}{'entries':>9}{'matched':>9}{'entries/sec':>14}")
+    matched = {}
+    for name, func in [
+        ("functions", filter_functions),
+        ("engine", filter_engine(engine)),
+    ]:
+        elapsed, result = measure(func, items)
+        matched[name] = set(x.link for x in result)
+        print(f"{name:<12}{SIZE:>9}{len(result):>9}{SIZE / elapsed:>14.0f}")
+    print(f"decisions differ: {len(matched['functions'] ^ matched['engine'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import tracemalloc
+from io import BytesIO
+from time import perf_counter
+from typing import Callable, Iterator, Tuple
+
+import feedparser
+from synthetic_feed import generate_feed
+
+from utils.feed import iter_rss_items
+
+SIZES = [100, 1000, 10000]
+
+
+def parse_feedparser(body: bytes) -> Iterator[dict]:
+    yield from feedparser.parse(body)["entries"]
+
+
+def parse_stream(body: bytes) -> Iterator[dict]:
+    yield from iter_rss_items(BytesIO(body))
+
+
+def measure(
+    parse: Callable[[bytes], Iterator[dict]], body: bytes
+) -> Tuple[float, float, int, int]:
+    tracemalloc.start()
+    start = perf_counter()
+    first = 0.0
+    count = 0
+    for _ in parse(body):
+        if count == 0:
+            first = perf_counter() - start
+        count += 1
+    total = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first, total, peak, count
+
+
+def main():
+    print(
+        f"{'parser':<12}{'entries':>9}{'first(ms)':>12}{'total(ms)':>12}{'peak(KiB)':>12}"
+    )
+    for n in SIZES:
+        body = generate_feed(n)
+        for name, parse in [("feedparser", parse_feedparser), ("stream", parse_stream)]:
+            first, total, peak, count = measure(parse, body)
+            print(
+                f"{name:<12}{count:>9}{first * 1000:>12.2f}{total * 1000:>12.2f}{peak / 1024:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import logging
+import os
+from time import perf_counter
+from typing import List
+
+from fake_aws import FakeDynamoDBResource
+
+from models.article import Article, StateArticle
+
+SIZES = [10, 100, 1000]
+LATENCY = 0.005
+
+
+def prepare(n: int) -> FakeDynamoDBResource:
+    dynamodb = FakeDynamoDBResource(LATENCY)
+    table = dynamodb.Table("article")
+    for i in range(n):
+        table.items[f"https://example.com/{i}"] = {
+            "url": f"https://example.com/{i}",
+            "status": StateArticle.Inserted.value,
+            "created_at": "2022-01-09 16:17:22.123456+09:00",
+            "updated_at": "2022-01-09 16:17:22.123456+09:00",
+            "error_messages": [],
+        }
+    return dynamodb
+
+
+def get_item_loop(urls: List[str], table) -> List[Article]:
+    return [Article.get_item(x, table) for x in urls]
+
+
+def main():
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))
+
+    print(f"{'items':>8}{'get_item(ms)':>16}{'get_many(ms)':>16}{'speedup':>10}")
+    for n in SIZES:
+        table = prepare(n).Table("article")
+        urls = [f"https://example.com/{i}" for i in range(n)]
+
+        start = perf_counter()
+        expected = get_item_loop(urls, table)
+        loop = perf_counter() - start
+
+        start = perf_counter()
+        actual = Article.get_many(urls, table)
+        batch = perf_counter() - start
+
+        assert actual.articles == expected and actual.missing == []
+        print(f"{n:>8}{loop * 1000:>16.1f}{batch * 1000:>16.1f}{loop / batch:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import logging
+import os
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+from io import BytesIO
+from time import perf_counter
+from typing import Callable, Dict, Iterator
+
+from fake_aws import FakeDynamoDBResource, FakeS3Resource
+from synthetic_feed import generate_feed
+
+import handlers.get_feed as index
+import models.article.article as article_module
+from logger.my_logger import DummyContext
+from models.entry import EntryFilter
+from models.seen_url import SeenUrlCache
+
+SIZES = [100, 1000, 10000]
+LATENCY = 0.005
+STAGES = ["fetch", "parse", "filter", "write"]
+
+timings: Dict[str, float] = defaultdict(float)
+
+
+def timed(stage: str, func: Callable) -> Callable:
+    @wraps(func)
+    def process(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[stage] += perf_counter() - start
+
+    return process
+
+
+def timed_iterator(stage: str, func: Callable[..., Iterator]) -> Callable:
+    @wraps(func)
+    def process(*args, **kwargs) -> Iterator:
+        iterator = func(*args, **kwargs)
+        while True:
+            start = perf_counter()
+            try:
+                value = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                timings[stage] += perf_counter() - start
+            yield value
+
+    return process
+
+
+def install(body: bytes):
+    class Response(BytesIO):
+        headers = {"ETag": '"bench"'}
+
+    index.http_open = timed("fetch", lambda url, headers: Response(body))
+    index.get_feed_entries = timed_iterator("parse", original_get_feed_entries)
+    # Filtering pulls entries through the parser, so time the per-entry check.
+    EntryFilter._evaluate = timed("filter", original_evaluate)
+    index.insert_articles = timed("write", original_insert_articles)
+
+
+def run(n: int, body: bytes, with_memory: bool) -> float:
+    dynamodb = FakeDynamoDBResource(LATENCY)
+    s3 = FakeS3Resource()
+    index.get_dynamodb_resource = lambda: dynamodb
+    article_module.get_attribute_value_client = (
+        lambda _: dynamodb.attribute_value_client
+    )
+    index.get_s3_resource = lambda: s3
+    index.seen_urls = SeenUrlCache()
+    timings.clear()
+    if with_memory:
+        tracemalloc.start()
+    start = perf_counter()
+    index.handler({}, DummyContext(aws_request_id=f"bench-{n}"))
+    elapsed = perf_counter() - start
+    if with_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+    return elapsed
+
+
+original_get_feed_entries = index.get_feed_entries
+original_evaluate = EntryFilter._evaluate
+original_insert_articles = index.insert_articles
+
+
+def main():
+    os.environ["DYNAMODB_TABLE_NAME"] = "article"
+    os.environ["DATA_BUCKET_NAME"] = "data"
+    os.environ["FEED_PARSER_MODE"] = "stream"
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))
+
+    header = "".join(f"{x + '(ms)':>12}" for x in STAGES)
+    print(
+        f"{'entries':>8}{'total(ms)':>12}{'entries/sec':>14}{header}{'peak(MiB)':>12}"
+    )
+    for n in SIZES:
+        body = generate_feed(n)
+        install(body)
+        elapsed = run(n, body, with_memory=False)
+        stages = dict(timings)
+        peak = run(n, body, with_memory=True)
+        columns = "".join(f"{stages.get(x, 0.0) * 1000:>12.1f}" for x in STAGES)
+        print(
+            f"{n:>8}{elapsed * 1000:>12.1f}{n / elapsed:>14.0f}{columns}{peak / 2**20:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
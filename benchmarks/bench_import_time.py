@@ -0,0 +1,49 @@
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULE = "handlers.get_feed"
+REPEAT = 5
+TOP = 15
+LINE_PATTERN = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_importtime(module: str) -> List[Tuple[int, int, int, str]]:
+    env = {**os.environ, "PYTHONPATH": "src"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = []
+    for line in proc.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        result.append((int(self_us), int(cumulative_us), len(indent), name))
+    return result
+
+
+def main():
+    best: Dict[str, int] = {}
+    for _ in range(REPEAT):
+        for _, cumulative, _, name in run_importtime(MODULE):
+            best[name] = min(best.get(name, cumulative), cumulative)
+    print(f"import {MODULE}: {best[MODULE] / 1000:.1f} ms (best of {REPEAT})")
+    roots = {
+        name: value
+        for name, value in best.items()
+        if "." not in name and name != MODULE
+    }
+    print(f"{'top-level package':<32}{'cumulative(ms)':>16}")
+    for name, value in sorted(roots.items(), key=lambda x: -x[1])[:TOP]:
+        print(f"{name:<32}{value / 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import logging
+from time import perf_counter
+from typing import List
+
+from logger import MyLogger
+from logger.json_log_formatter import FastJsonLogFormatter, JsonLogFormatter
+from models.article import Article, StateArticle
+
+SIZE = 20000
+REPEAT = 5
+
+logger = MyLogger(__name__)
+
+
+class CollectHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+
+def create_records() -> List[logging.LogRecord]:
+    handler = CollectHandler()
+    target = logging.getLogger(__name__)
+    target.handlers = [handler]
+    target.propagate = False
+    logger.set_shared_data("aws_request_id", "c6af9ac6-7b61-11e6-9a41-93e8deadbeef")
+    for i in range(SIZE // 2):
+        article = Article(
+            url=f"https://e-hentai.org/g/{i}/37cfac63e0/",
+            status=StateArticle.Inserted,
+            title="[Doujinshi] Oyasumi, Onii-chan",
+        )
+        logger.debug(
+            f"function put_item start ({i})",
+            func_id=str(i),
+            function_name="put_item",
+            memo=[[]],
+        )
+        logger.debug(
+            f"function put_item end (success) ({i}) (Duration: 0:00:00.012000)",
+            func_id=str(i),
+            function_name="put_item",
+            is_succeed=True,
+            duration=0.012,
+            memo=[{"key": "updated", "value": article}],
+            result=article,
+        )
+    return handler.records
+
+
+def measure(formatter: logging.Formatter, records: List[logging.LogRecord]):
+    best = float("inf")
+    lines: List[str] = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        lines = [formatter.format(x) for x in records]
+        best = min(best, perf_counter() - start)
+    return best, lines
+
+
+def main():
+    records = create_records()
+    print(f"{'formatter':<12}{'records':>9}{'records/sec':>14}")
+    outputs = {}
+    for name, formatter in [
+        ("stdlib", JsonLogFormatter()),
+        ("fast", FastJsonLogFormatter()),
+    ]:
+        elapsed, outputs[name] = measure(formatter, records)
+        print(f"{name:<12}{len(records):>9}{len(records) / elapsed:>14.0f}")
+    print(f"identical output: {outputs['stdlib'] == outputs['fast']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import logging
+import os
+from time import perf_counter
+from typing import Callable
+
+from logger import MyLogger
+
+CALLS = 200000
+REPEAT = 5
+
+logger = MyLogger(__name__)
+
+
+def plain(value: int) -> int:
+    return value + 1
+
+
+@logger.logging_function()
+def wrapped(value: int) -> int:
+    return value + 1
+
+
+@logger.logging_function(with_arg=True, with_return=True)
+def wrapped_with_arg(value: int) -> int:
+    return value + 1
+
+
+@logger.logging_function(write_log=True)
+def wrapped_write_log(value: int) -> int:
+    return value + 1
+
+
+def measure(func: Callable[[int], int], calls: int) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = perf_counter()
+        for i in range(calls):
+            func(i)
+        best = min(best, perf_counter() - start)
+    return best / calls
+
+
+def main():
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(open(os.devnull, "w"))
+
+    base = measure(plain, CALLS)
+    print(f"{'function':<20}{'level':>7}{'ns/call':>10}{'overhead':>10}")
+    for level in [logging.DEBUG, logging.INFO]:
+        logging.getLogger().setLevel(level)
+        for name, func, calls in [
+            ("logging_function", wrapped, CALLS),
+            ("with_arg", wrapped_with_arg, CALLS),
+            ("write_log", wrapped_write_log, CALLS // 20),
+        ]:
+            elapsed = measure(func, calls)
+            print(
+                f"{name:<20}{logging.getLevelName(level):>7}"
+                f"{elapsed * 1e9:>10.0f}{(elapsed - base) * 1e9:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
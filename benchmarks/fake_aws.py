@@ -0,0 +1,144 @@
+from copy import deepcopy
+from io import BytesIO
+from threading import Lock
+from time import sleep
+from typing import Dict, List, Optional
+
+from botocore.exceptions import ClientError
+
+from models.article.article import decode_item
+
+
+def project(item: dict, option: dict) -> dict:
+    if "ProjectionExpression" not in option:
+        return deepcopy(item)
+    names = option.get("ExpressionAttributeNames", {})
+    keys = [
+        names.get(x.strip(), x.strip())
+        for x in option["ProjectionExpression"].split(",")
+    ]
+    return {k: deepcopy(item[k]) for k in keys if k in item}
+
+
+class FakeMeta(object):
+    def __init__(self, client):
+        self.client = client
+
+
+class FakeDynamoDBClient(object):
+    def __init__(self, resource: "FakeDynamoDBResource"):
+        self.resource = resource
+
+    def batch_get_item(self, RequestItems: Dict[str, dict]) -> dict:
+        self.resource.wait()
+        responses = {}
+        for name, request in RequestItems.items():
+            items = self.resource.tables[name].items
+            responses[name] = [
+                project(items[x["url"]], request)
+                for x in request["Keys"]
+                if x["url"] in items
+            ]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+
+class FakeAttributeValueClient(object):
+    def __init__(self, resource: "FakeDynamoDBResource"):
+        self.resource = resource
+
+    def transact_write_items(self, TransactItems: List[dict]) -> dict:
+        self.resource.wait()
+        puts = [x["Put"] for x in TransactItems]
+        items = [decode_item(x["Item"]) for x in puts]
+        tables = [self.resource.tables[x["TableName"]] for x in puts]
+        reasons = [
+            "ConditionalCheckFailed" if x["url"] in table.items else "None"
+            for x, table in zip(items, tables)
+        ]
+        if "ConditionalCheckFailed" in reasons:
+            raise ClientError(
+                {
+                    "Error": {"Code": "TransactionCanceledException"},
+                    "CancellationReasons": [{"Code": x} for x in reasons],
+                },
+                "TransactWriteItems",
+            )
+        for item, table in zip(items, tables):
+            with table.lock:
+                table.items[item["url"]] = item
+        return {}
+
+
+class FakeTable(object):
+    def __init__(self, resource: "FakeDynamoDBResource", name: str):
+        self.resource = resource
+        self.name = name
+        self.items: Dict[str, dict] = {}
+        self.lock = Lock()
+        self.meta = FakeMeta(resource.client)
+
+    def put_item(self, Item: dict, ConditionExpression=None):
+        self.resource.wait()
+        with self.lock:
+            self.items[Item["url"]] = deepcopy(Item)
+
+    def get_item(self, Key: dict, **kwargs) -> dict:
+        self.resource.wait()
+        item = self.items.get(Key["url"])
+        return {} if item is None else {"Item": project(item, kwargs)}
+
+    def scan(self, **option) -> dict:
+        self.resource.wait()
+        return {"Items": [project(x, option) for x in self.items.values()]}
+
+
+class FakeDynamoDBResource(object):
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.client = FakeDynamoDBClient(self)
+        self.attribute_value_client = FakeAttributeValueClient(self)
+        self.tables: Dict[str, FakeTable] = {}
+
+    def wait(self):
+        if self.latency > 0:
+            sleep(self.latency)
+
+    def Table(self, name: str) -> FakeTable:
+        if name not in self.tables:
+            self.tables[name] = FakeTable(self, name)
+        return self.tables[name]
+
+
+class FakeObject(object):
+    def __init__(self, bucket: "FakeBucket", key: str):
+        self.bucket = bucket
+        self.key = key
+
+    def get(self) -> dict:
+        body: Optional[bytes] = self.bucket.objects.get(self.key)
+        if body is None:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": self.key}}, "GetObject"
+            )
+        return {"Body": BytesIO(body)}
+
+
+class FakeBucket(object):
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+
+    def Object(self, key: str) -> FakeObject:
+        return FakeObject(self, key)
+
+    def put_object(self, Key: str, Body: bytes, **kwargs):
+        self.objects[Key] = Body
+
+
+class FakeS3Resource(object):
+    def __init__(self):
+        self.buckets: Dict[str, FakeBucket] = {}
+
+    def Bucket(self, name: str) -> FakeBucket:
+        if name not in self.buckets:
+            self.buckets[name] = FakeBucket()
+        return self.buckets[name]
@@ -0,0 +1,101 @@
+from random import Random
+from typing import List
+from xml.sax.saxutils import escape
+
+CATEGORIES = [
+    ("Doujinshi", 30),
+    ("Manga", 20),
+    ("Artist CG", 10),
+    ("Game CG", 5),
+    ("Western", 8),
+    ("Non-H", 7),
+    ("Image Set", 8),
+    ("Cosplay", 5),
+    ("Asian Porn", 3),
+    ("Misc", 4),
+]
+LANGUAGES = [
+    (None, 55),
+    ("japanese", 10),
+    ("english", 15),
+    ("chinese", 12),
+    ("korean", 4),
+    ("spanish", 4),
+]
+NAMESPACES = ["parody", "character", "group", "artist", "male", "female", "mixed"]
+WORDS = [
+    "big breasts",
+    "sole female",
+    "sole male",
+    "stockings",
+    "glasses",
+    "full color",
+    "schoolgirl uniform",
+    "twintails",
+    "original",
+    "hair buns",
+    "multi-work series",
+    "mosaic censorship",
+    "story arc",
+    "ins-mode",
+    "amanagi seiji",
+]
+
+
+def choose(rnd: Random, weighted: list):
+    return rnd.choices([x[0] for x in weighted], weights=[x[1] for x in weighted], k=1)[
+        0
+    ]
+
+
+def generate_title(rnd: Random) -> str:
+    category = choose(rnd, CATEGORIES)
+    words = " ".join(rnd.choice(WORDS).title() for _ in range(rnd.randint(2, 8)))
+    return f"[{category}] ({rnd.choice(['C100', 'C101', 'COMIC1'])}) [{rnd.choice(WORDS).title()}] {words}"
+
+
+def generate_summary(rnd: Random) -> str:
+    tags: List[str] = []
+    language = choose(rnd, LANGUAGES)
+    if language is not None:
+        tags.append(f"language:{language}")
+        if language != "japanese":
+            tags.append("language:translated")
+    for _ in range(rnd.randint(1, 15)):
+        tags.append(f"{rnd.choice(NAMESPACES)}:{rnd.choice(WORDS)}")
+    tags.append(f"other:{rnd.choice(WORDS)}")
+    comment = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(0, 40)))
+    return f"{', '.join(tags)} {comment}".strip()
+
+
+def generate_items(n: int, seed: int = 0, start_gid: int = 2330808) -> List[dict]:
+    rnd = Random(seed)
+    return [
+        {
+            "link": f"https://e-hentai.org/g/{start_gid - i}/{rnd.getrandbits(40):010x}/",
+            "title": generate_title(rnd),
+            "summary": generate_summary(rnd),
+        }
+        for i in range(n)
+    ]
+
+
+def generate_feed(n: int, seed: int = 0, start_gid: int = 2330808) -> bytes:
+    items = "".join(
+        "<item>"
+        f"<title>{escape(x['title'])}</title>"
+        f"<link>{escape(x['link'])}</link>"
+        f"<description>{escape(x['summary'])}</description>"
+        "<pubDate>Sat, 01 Oct 2022 00:00:00 +0000</pubDate>"
+        "</item>\n"
+        for x in generate_items(n, seed, start_gid)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0"><channel>'
+        "<title>E-Hentai Galleries</title>"
+        "<link>https://e-hentai.org/</link>"
+        "<description>Latest Galleries</description>\n"
+        f"{items}"
+        "</channel></rss>\n"
+    ).encode()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import MISSING, asdict, dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from boto3.dynamodb.conditions import Attr
+
+from logger import MyLogger
+from models.article import Article
+from models.export_manifest import ExportChunk, ExportManifest
+from utils.aws import get_dynamodb_resource, get_s3_resource
+from utils.datetime import now, to_epoch_ms
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_s3 import S3ServiceResource
+    from mypy_boto3_s3.service_resource import Bucket
+
+DEFAULT_SEGMENTS = 4
+DEFAULT_CHUNK_SIZE = 10000
+# Covers clock skew between writers; readers dedupe on url and updated_at_ms.
+INCREMENTAL_OVERLAP_MS = 60000
+
+
+@dataclass(frozen=True)
+class EnvironmentVariables:
+    dynamodb_table_name: str
+    data_bucket_name: str
+    export_segments: str = str(DEFAULT_SEGMENTS)
+    export_chunk_size: str = str(DEFAULT_CHUNK_SIZE)
+
+
+logger = MyLogger(__name__)
+
+
+@logger.logging_handler(with_return=False)
+def handler(event, context):
+    main(full=bool((event or {}).get("full", False)))
+
+
+@logger.logging_function()
+def main(
+    dynamodb_resource: Optional[DynamoDBServiceResource] = None,
+    s3_resource: Optional[S3ServiceResource] = None,
+    full: bool = False,
+) -> ExportManifest:
+    if dynamodb_resource is None:
+        dynamodb_resource = get_dynamodb_resource()
+    if s3_resource is None:
+        s3_resource = get_s3_resource()
+    env = load_environment()
+    table = dynamodb_resource.Table(env.dynamodb_table_name)
+    bucket = s3_resource.Bucket(env.data_bucket_name)
+
+    latest = None if full else ExportManifest.load_latest(bucket)
+    started_at_ms = to_epoch_ms(now())
+    manifest = ExportManifest(
+        export_id=str(started_at_ms),
+        started_at_ms=started_at_ms,
+        since_ms=(
+            None
+            if latest is None
+            else max(0, latest.started_at_ms - INCREMENTAL_OVERLAP_MS)
+        ),
+        segments=int(env.export_segments),
+    )
+    manifest.chunks = export_table(
+        table,
+        bucket,
+        ExportManifest.build_prefix(manifest.export_id),
+        manifest.segments,
+        int(env.export_chunk_size),
+        manifest.since_ms,
+    )
+    manifest.save(bucket)
+    logger.add_functional_data("exported", manifest.get_item_count())
+    return manifest
+
+
+@logger.logging_function()
+def load_environment() -> EnvironmentVariables:
+    return EnvironmentVariables(
+        **{
+            k: os.environ[k.upper()]
+            for k, v in EnvironmentVariables.__dict__["__dataclass_fields__"].items()
+            if k.upper() in os.environ or v.default is MISSING
+        }
+    )
+
+
+@logger.logging_function(write_log=True, with_arg=True)
+def export_table(
+    table: Table,
+    bucket: Bucket,
+    prefix: str,
+    segments: int,
+    chunk_size: int,
+    since_ms: Optional[int] = None,
+) -> List[ExportChunk]:
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        futures = [
+            executor.submit(
+                export_segment,
+                table,
+                bucket,
+                prefix,
+                x,
+                segments,
+                chunk_size,
+                since_ms,
+            )
+            for x in range(segments)
+        ]
+        return [chunk for x in futures for chunk in x.result()]
+
+
+@logger.logging_function(write_log=True, with_arg=True)
+def export_segment(
+    table: Table,
+    bucket: Bucket,
+    prefix: str,
+    segment: int,
+    segments: int,
+    chunk_size: int,
+    since_ms: Optional[int] = None,
+) -> List[ExportChunk]:
+    chunks: List[ExportChunk] = []
+    writer = ChunkWriter(bucket, prefix, segment)
+    # Segments run in threads; clients are thread-safe, resources are not.
+    client: Any = table.meta.client
+    option: dict = {
+        "TableName": table.name,
+        "Segment": segment,
+        "TotalSegments": segments,
+    }
+    if since_ms is not None:
+        # The filter applies after the read, so an incremental run still
+        # consumes read capacity for the whole table and only saves on
+        # transfer and writes.
+        option["FilterExpression"] = Attr("updated_at_ms").gte(since_ms)
+    while True:
+        resp = client.scan(**option)
+        items: List[dict] = resp.get("Items", [])
+        for item in items:
+            writer.write(Article(**item))
+            if writer.count >= chunk_size:
+                chunks.append(writer.flush())
+        token = resp.get("LastEvaluatedKey")
+        if token is None:
+            break
+        option["ExclusiveStartKey"] = token
+    if writer.count > 0:
+        chunks.append(writer.flush())
+    return chunks
+
+
+class ChunkWriter(object):
+    bucket: Bucket
+    prefix: str
+    segment: int
+    index: int
+    count: int
+    buffer: BytesIO
+    stream: gzip.GzipFile
+
+    def __init__(self, bucket: Bucket, prefix: str, segment: int):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.segment = segment
+        self.index = 0
+        self.open()
+
+    def open(self):
+        self.count = 0
+        self.buffer = BytesIO()
+        self.stream = gzip.GzipFile(fileobj=self.buffer, mode="wb")
+
+    def write(self, article: Article):
+        line = json.dumps(asdict(article), ensure_ascii=False)
+        self.stream.write(line.encode())
+        self.stream.write(b"\n")
+        self.count += 1
+
+    @logger.logging_function(write_log=True, with_return=True)
+    def flush(self) -> ExportChunk:
+        self.stream.close()
+        key = f"{self.prefix}/segment-{self.segment:04d}-{self.index:05d}.jsonl.gz"
+        client: Any = self.bucket.meta.client
+        client.put_object(
+            Bucket=self.bucket.name,
+            Key=key,
+            Body=self.buffer.getvalue(),
+            ContentType="application/gzip",
+        )
+        chunk = ExportChunk(key=key, segment=self.segment, count=self.count)
+        self.index += 1
+        self.open()
+        return chunk
@@ -1,34 +1,74 @@
+from __future__ import annotations
+
 import os
-from dataclasses import dataclass
-from typing import Iterator, List, Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import MISSING, dataclass
+from enum import Enum
+from http.client import HTTPResponse
+from threading import BoundedSemaphore
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
 
-import boto3
 import feedparser
 from boto3.dynamodb.conditions import Attr
 from botocore.client import ClientError
-from mypy_boto3_dynamodb import DynamoDBServiceResource
-from mypy_boto3_dynamodb.service_resource import Table
 
 from logger import MyLogger
 from models.article import Article
+from models.entry import EntryFilter, EntrySummary, FilterRules, TagVocabulary
+from models.feed_state import FeedState
+from models.seen_url import SeenUrlCache
+from utils.aws import get_dynamodb_resource, get_s3_resource
+from utils.feed import iter_rss_items
+from utils.http import generate_host_limiter, http_open
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBServiceResource
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_s3 import S3ServiceResource
+
+FEED_URL = "https://xml.e-hentai.org/ehg.xml"
+TARGET_CATEGORY = ["Manga", "Artist CG", "Doujinshi"]
+GID_PATTERN = re.compile(r"/g/(\d+)/")
+DEFAULT_FILTER_RULES = FilterRules(
+    categories=frozenset(TARGET_CATEGORY),
+    namespace_allowlists={"language": frozenset(["japanese"])},
+)
+MAX_FEED_WORKERS = 8
+MAX_REQUESTS_PER_HOST = 2
+
+
+class FeedParserMode(str, Enum):
+    Feedparser = "feedparser"
+    Stream = "stream"
 
 
 @dataclass(frozen=True)
 class EnvironmentVariables:
     dynamodb_table_name: str
+    data_bucket_name: str
+    feed_parser_mode: str = FeedParserMode.Feedparser
+    feed_urls: str = FEED_URL
+    filter_rules: str = ""
 
 
 @dataclass(frozen=True)
-class EntrySummary:
-    link: str
-    title: str
-    summary: Optional[str]
+class InsertSummary:
+    attempted: int
+    written: int
+    skipped: int
 
 
-logger = MyLogger(__name__)
+@dataclass(frozen=True)
+class FeedResult:
+    state: FeedState
+    entries: List[EntrySummary]
+    # Highest gid among all fetched entries, matched by the filter or not.
+    last_gid: Optional[int] = None
 
-FEED_URL = "https://xml.e-hentai.org/ehg.xml"
-TARGET_CATEGORY = ["Manga", "Artist CG", "Doujinshi"]
+
+logger = MyLogger(__name__)
+seen_urls = SeenUrlCache()
 
 
 @logger.logging_handler(with_return=False)
@@ -37,15 +77,30 @@ def handler(event, context):
 
 
 @logger.logging_function()
-def main(dynamodb_resource: DynamoDBServiceResource = boto3.resource("dynamodb")):
+def main(
+    dynamodb_resource: Optional[DynamoDBServiceResource] = None,
+    s3_resource: Optional[S3ServiceResource] = None,
+) -> Optional[InsertSummary]:
+    if dynamodb_resource is None:
+        dynamodb_resource = get_dynamodb_resource()
+    if s3_resource is None:
+        s3_resource = get_s3_resource()
     env = load_environment()
     table = dynamodb_resource.Table(env.dynamodb_table_name)
-    for entry in get_feed_entries():
-        if not is_target_category(entry.title):
-            continue
-        if has_foreigner_language_tag(entry.summary):
-            continue
-        insert_article(entry.link, table)
+    bucket = s3_resource.Bucket(env.data_bucket_name)
+    TagVocabulary().reset_if_full()
+    states = [FeedState.load(x, bucket) for x in parse_feed_urls(env.feed_urls)]
+    entry_filter = EntryFilter(load_filter_rules(env.filter_rules))
+    results = fetch_feeds(states, env.feed_parser_mode, entry_filter)
+    if len(results) == 0:
+        return None
+    urls = [x.link for x in merge_entries(results)]
+    seen_urls.load(bucket)
+    summary = insert_articles(urls, table, seen_urls)
+    for result in results:
+        update_watermark(result)
+        result.state.save(bucket)
+    return summary
 
 
 @logger.logging_function()
@@ -53,17 +108,148 @@ def load_environment() -> EnvironmentVariables:
     return EnvironmentVariables(
         **{
             k: os.environ[k.upper()]
-            for k in EnvironmentVariables.__dict__["__dataclass_fields__"].keys()
+            for k, v in EnvironmentVariables.__dict__["__dataclass_fields__"].items()
+            if k.upper() in os.environ or v.default is MISSING
         }
     )
 
 
 @logger.logging_function()
-def get_feed_entries() -> Iterator[EntrySummary]:
-    for x in feedparser.parse(FEED_URL)["entries"]:
+def load_filter_rules(text: str) -> FilterRules:
+    if text == "":
+        return DEFAULT_FILTER_RULES
+    return FilterRules.from_json(text)
+
+
+@logger.logging_function()
+def parse_feed_urls(text: str) -> List[str]:
+    return list(dict.fromkeys(x.strip() for x in text.split(",") if x.strip()))
+
+
+@logger.logging_function(write_log=True)
+def fetch_feeds(
+    states: List[FeedState], mode: str, entry_filter: EntryFilter
+) -> List[FeedResult]:
+    limiter = generate_host_limiter(MAX_REQUESTS_PER_HOST)
+    results: List[FeedResult] = []
+    with ThreadPoolExecutor(max_workers=MAX_FEED_WORKERS) as executor:
+        futures = [
+            executor.submit(collect_feed, x, mode, limiter, entry_filter)
+            for x in states
+        ]
+        for state, future in zip(states, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # Dropping the result keeps this feed's watermark and
+                # validators unsaved, so the next run fetches it again.
+                logger.error(f"error occurred in collecting feed: {e}", url=state.url)
+                continue
+            if result is not None:
+                results.append(result)
+    return results
+
+
+@logger.logging_function(write_log=True, with_arg=True)
+def collect_feed(
+    state: FeedState,
+    mode: str,
+    limiter: Callable[[str], BoundedSemaphore],
+    entry_filter: EntryFilter,
+) -> Optional[FeedResult]:
+    last_gid: Optional[int] = None
+
+    def track_gids(entries: Iterator[EntrySummary]) -> Iterator[EntrySummary]:
+        nonlocal last_gid
+        for x in entries:
+            gid = parse_gid(x.link)
+            if gid is not None and (last_gid is None or gid > last_gid):
+                last_gid = gid
+            yield x
+
+    with limiter(state.url):
+        feed = fetch_feed(state, mode)
+        if feed is None:
+            return None
+        # Entries are filtered as they are parsed, so only matches are kept.
+        entries = entry_filter.filter(
+            track_gids(get_feed_entries(feed, state.last_gid))
+        )
+    return FeedResult(state=state, entries=entries, last_gid=last_gid)
+
+
+@logger.logging_function()
+def merge_entries(results: List[FeedResult]) -> Iterator[EntrySummary]:
+    links = set()
+    for result in results:
+        for entry in result.entries:
+            if entry.link in links:
+                continue
+            links.add(entry.link)
+            yield entry
+
+
+@logger.logging_function()
+def update_watermark(result: FeedResult):
+    if result.last_gid is not None:
+        result.state.last_gid = result.last_gid
+
+
+@logger.logging_function(write_log=True)
+def fetch_feed(
+    state: FeedState, mode: str = FeedParserMode.Feedparser
+) -> Optional[dict]:
+    if mode == FeedParserMode.Stream:
+        return fetch_feed_stream(state)
+    feed = feedparser.parse(state.url, etag=state.etag, modified=state.modified)
+    if feed.get("status") == 304:
+        logger.info("feed is not modified", url=state.url)
+        return None
+    state.etag = feed.get("etag")
+    state.modified = feed.get("modified")
+    return feed
+
+
+@logger.logging_function(write_log=True)
+def fetch_feed_stream(state: FeedState) -> Optional[dict]:
+    headers: Dict[str, str] = {}
+    if state.etag is not None:
+        headers["If-None-Match"] = state.etag
+    if state.modified is not None:
+        headers["If-Modified-Since"] = state.modified
+    resp = http_open(state.url, headers)
+    if resp is None:
+        logger.info("feed is not modified", url=state.url)
+        return None
+    state.etag = resp.headers.get("ETag")
+    state.modified = resp.headers.get("Last-Modified")
+    return {"entries": stream_entries(resp)}
+
+
+def stream_entries(resp: HTTPResponse) -> Iterator[Dict[str, str]]:
+    with resp:
+        yield from iter_rss_items(resp)
+
+
+@logger.logging_function()
+def get_feed_entries(
+    feed: dict, watermark: Optional[int] = None
+) -> Iterator[EntrySummary]:
+    for x in feed["entries"]:
+        gid = parse_gid(x["link"])
+        if watermark is not None and gid is not None and gid <= watermark:
+            return
         yield EntrySummary(link=x["link"], title=x["title"], summary=x["summary"])
 
 
+@logger.logging_function()
+def parse_gid(url: str) -> Optional[int]:
+    match = GID_PATTERN.search(url)
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
 @logger.logging_function()
 def is_target_category(title: str) -> bool:
     index = title.find("]")
@@ -87,3 +273,28 @@ def insert_article(url: str, table: Table):
     except ClientError as e:
         if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
             raise
+
+
+@logger.logging_function(write_log=True, with_return=True)
+def insert_articles(
+    urls: List[str], table: Table, cache: Optional[SeenUrlCache] = None
+) -> InsertSummary:
+    if cache is None:
+        cache = SeenUrlCache()
+    targets = list(dict.fromkeys(urls))
+    _, possible, new = cache.classify(targets)
+    existing = Article.get_existing_urls(possible, table)
+    fresh = set(new) | set(x for x in possible if x not in existing)
+    articles = [Article.create_inserted_item(x) for x in targets if x in fresh]
+    cache.add_confirmed(existing)
+    if len(articles) > 0:
+        cache.add_possible(x.url for x in articles)
+        cache.save()
+    # The snapshot may be stale, so "new" urls are still inserted conditionally.
+    inserted = Article.insert_items(articles, table)
+    cache.add_confirmed(x.url for x in articles)
+    return InsertSummary(
+        attempted=len(targets),
+        written=len(inserted),
+        skipped=len(targets) - len(inserted),
+    )
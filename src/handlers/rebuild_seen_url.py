@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+from dataclasses import MISSING, dataclass
+from typing import TYPE_CHECKING, Optional
+
+from logger import MyLogger
+from models.seen_url import SeenUrlCache
+from models.seen_url.seen_url import BLOOM_CAPACITY
+from utils.aws import get_dynamodb_resource, get_s3_resource
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBServiceResource
+    from mypy_boto3_s3 import S3ServiceResource
+
+
+@dataclass(frozen=True)
+class EnvironmentVariables:
+    dynamodb_table_name: str
+    data_bucket_name: str
+
+
+logger = MyLogger(__name__)
+
+
+@logger.logging_handler(with_return=False)
+def handler(event, context):
+    main()
+
+
+@logger.logging_function()
+def main(
+    dynamodb_resource: Optional[DynamoDBServiceResource] = None,
+    s3_resource: Optional[S3ServiceResource] = None,
+) -> int:
+    if dynamodb_resource is None:
+        dynamodb_resource = get_dynamodb_resource()
+    if s3_resource is None:
+        s3_resource = get_s3_resource()
+    env = load_environment()
+    table = dynamodb_resource.Table(env.dynamodb_table_name)
+    bucket = s3_resource.Bucket(env.data_bucket_name)
+
+    # item_count lags by up to six hours, which the doubling absorbs.
+    capacity = max(BLOOM_CAPACITY, table.item_count * 2)
+    bloom = SeenUrlCache().rebuild(table, bucket, capacity)
+    logger.add_functional_data("count", bloom.count)
+    return bloom.count
+
+
+@logger.logging_function()
+def load_environment() -> EnvironmentVariables:
+    return EnvironmentVariables(
+        **{
+            k: os.environ[k.upper()]
+            for k, v in EnvironmentVariables.__dict__["__dataclass_fields__"].items()
+            if k.upper() in os.environ or v.default is MISSING
+        }
+    )
@@ -1,2 +1,3 @@
-from .borg_default import CustomDefaultReturn
+from .borg_default import CustomDefaultReturn, DefaultConverter
+from .config import configure_logging
 from .my_logger import MyLogger
@@ -1,6 +1,8 @@
 class BorgData:
     _shared_state: dict = {}
     data: dict = {}
+    # Bumped on every change so formatters can reuse the encoded data.
+    version: int = 0
 
     def __init__(self):
         self.__dict__ = self._shared_state
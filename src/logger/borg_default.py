@@ -1,39 +1,82 @@
 from base64 import b64encode
 from dataclasses import asdict, is_dataclass
 from decimal import Decimal
-from typing import Any, Callable, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from boto3.dynamodb.conditions import AttributeBase, ConditionBase
 
 Jsonable = Union[dict, list, str, int, float, bool, None]
 CustomDefaultReturn = Tuple[bool, Jsonable]
 CustomDefaultFunction = Callable[[Any], CustomDefaultReturn]
+DefaultConverter = Callable[[Any], Jsonable]
+
+
+def convert_decimal(obj: Decimal) -> Jsonable:
+    num = int(obj)
+    return num if num == obj else float(obj)
+
+
+def convert_bytes(obj: bytes) -> Jsonable:
+    try:
+        return obj.decode()
+    except Exception:
+        return b64encode(obj).decode()
+
+
+def convert_attribute(obj: AttributeBase) -> Jsonable:
+    return obj.name  # type: ignore
+
+
+def convert_condition(obj: ConditionBase) -> Jsonable:
+    return obj.get_expression()  # type: ignore
+
+
+def convert_dataclass(obj: Any) -> Jsonable:
+    return asdict(obj)
 
 
 class BorgDefaultFunctions:
     _shared_state: dict = {}
     functions: List[CustomDefaultFunction] = []
+    registry: Dict[type, DefaultConverter] = {
+        Decimal: convert_decimal,
+        bytes: convert_bytes,
+        AttributeBase: convert_attribute,
+        ConditionBase: convert_condition,
+    }
+    # Resolved converter per concrete type; None falls through to functions.
+    dispatch_cache: Dict[type, Optional[DefaultConverter]] = {}
 
     def __init__(self):
         self.__dict__ = self._shared_state
 
+    def register(self, cls: type, func: DefaultConverter):
+        self.registry[cls] = func
+        self.dispatch_cache.clear()
+
+    def resolve(self, cls: type) -> Optional[DefaultConverter]:
+        for base in cls.__mro__:
+            func = self.registry.get(base)
+            if func is not None:
+                return func
+        if is_dataclass(cls):
+            return convert_dataclass
+        return None
+
+    def dispatch(self, cls: type) -> Optional[DefaultConverter]:
+        try:
+            return self.dispatch_cache[cls]
+        except KeyError:
+            func = self.resolve(cls)
+            self.dispatch_cache[cls] = func
+            return func
+
     def default(self, obj: Any) -> Jsonable:
-        if isinstance(obj, Decimal):
-            num = int(obj)
-            return num if num == obj else float(obj)
-        if isinstance(obj, bytes):
-            try:
-                return obj.decode()
-            except Exception:
-                return b64encode(obj).decode()
-        if isinstance(obj, AttributeBase):
-            return obj.name  # type: ignore
-        if isinstance(obj, ConditionBase):
-            return obj.get_expression()  # type: ignore
-        if is_dataclass(obj):
-            return asdict(obj)
-        for func in self.functions:
-            flag, value = func(obj)
+        func = self.dispatch(type(obj))
+        if func is not None:
+            return func(obj)
+        for custom in self.functions:
+            flag, value = custom(obj)
             if flag:
                 return value
         return {"type": str(type(obj)), "value": str(obj)}
@@ -0,0 +1,30 @@
+import json
+import logging.config
+import os
+from functools import lru_cache
+from threading import Lock
+
+LOGGING_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "logging.json"
+)
+
+lock = Lock()
+is_configured = False
+
+
+@lru_cache(maxsize=None)
+def read_logging_config() -> str:
+    with open(LOGGING_CONFIG_PATH) as f:
+        return f.read()
+
+
+def configure_logging():
+    global is_configured
+    if is_configured:
+        return
+    with lock:
+        if is_configured:
+            return
+        # dictConfig mutates its argument, so always hand it a fresh dict.
+        logging.config.dictConfig(json.loads(read_logging_config()))
+        is_configured = True
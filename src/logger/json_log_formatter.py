@@ -1,10 +1,12 @@
 import json
+from dataclasses import fields
 from datetime import datetime, timezone
+from json.encoder import encode_basestring  # type: ignore
 from logging import Formatter, LogRecord
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .borg_data import BorgData
-from .borg_default import BorgDefaultFunctions
+from .borg_default import BorgDefaultFunctions, Jsonable, convert_dataclass
 
 borg_default = BorgDefaultFunctions()
 borg_data = BorgData()
@@ -32,3 +34,84 @@ class JsonLogFormatter(Formatter):
             },
         }
         return json.dumps(result, ensure_ascii=False, default=borg_default.default)
+
+
+class FastJsonLogFormatter(JsonLogFormatter):
+    # Produces exactly the output of JsonLogFormatter. Shared data is encoded
+    # once per BorgData.version, so it must change through MyLogger only.
+    encoder: json.JSONEncoder
+    no_exc_info: str
+    static_parts: Dict[Tuple[str, str, str], Tuple[str, str]]
+    dataclass_fields: Dict[type, Tuple[str, ...]]
+    shared_version: int
+    shared_json: str
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.encoder = json.JSONEncoder(ensure_ascii=False, default=self.default)
+        # Records logged with exc_info=True outside an except block.
+        self.no_exc_info = self.encoder.encode(
+            self.formatException((None, None, None)).split("\n")
+        )
+        self.static_parts = {}
+        self.dataclass_fields = {}
+        self.shared_version = -1
+        self.shared_json = ""
+
+    def default(self, obj: Any) -> Jsonable:
+        cls = type(obj)
+        func = borg_default.dispatch(cls)
+        if func is None:
+            return borg_default.default(obj)
+        if func is not convert_dataclass:
+            return func(obj)
+        names = self.dataclass_fields.get(cls)
+        if names is None:
+            names = tuple(x.name for x in fields(cls))
+            self.dataclass_fields[cls] = names
+        # Nested values are handed back to the encoder, so this matches asdict
+        # without its deep copy.
+        return {x: getattr(obj, x) for x in names}
+
+    def format(self, record: LogRecord) -> str:
+        key = (record.name, record.levelname, record.pathname)
+        parts = self.static_parts.get(key)
+        if parts is None:
+            parts = (
+                f'{{"name": {encode_basestring(record.name)}, '
+                f'"level": {encode_basestring(record.levelname)}, "msg": ',
+                f', "pathname": {encode_basestring(record.pathname)}, '
+                '"shared_data": ',
+            )
+            self.static_parts[key] = parts
+
+        exc_info = record.exc_info
+        if exc_info is None:
+            txt_exc_info = "null"
+        elif exc_info[0] is None:
+            txt_exc_info = self.no_exc_info
+        else:
+            txt_exc_info = self.encoder.encode(self.convert_exc_info(record))
+
+        version = borg_data.version
+        if version != self.shared_version:
+            self.shared_json = self.encoder.encode(dict(borg_data.data))
+            self.shared_version = version
+
+        return "".join(
+            [
+                parts[0],
+                encode_basestring(record.getMessage()),
+                ', "unixtime": ',
+                repr(record.created),
+                ', "datetime": "',
+                str(datetime.fromtimestamp(record.created, timezone.utc)),
+                '", "exc_info": ',
+                txt_exc_info,
+                parts[1],
+                self.shared_json,
+                ', "additional_data": ',
+                self.encoder.encode(dict(record.__dict__.get("additional_data", {}))),
+                "}",
+            ]
+        )
@@ -1,19 +1,20 @@
-import json
-import logging.config
 import os
 import sys
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import timedelta
 from functools import wraps
-from logging import Logger, getLogger
-from typing import Any, Callable, List
-from uuid import uuid4
+from itertools import count
+from logging import DEBUG, Logger, getLogger
+from threading import local
+from time import perf_counter_ns
+from typing import Any, Callable, List, Optional
 
 import boto3
 import botocore
 
 from .borg_data import BorgData
-from .borg_default import BorgDefaultFunctions, CustomDefaultFunction
+from .borg_default import BorgDefaultFunctions, CustomDefaultFunction, DefaultConverter
+from .config import configure_logging
 
 ENVIRONMENT_VARIABLES_NOT_LOGGING = [
     "AWS_ACCESS_KEY_ID",
@@ -29,6 +30,19 @@ ENVIRONMENT_VARIABLES_NOT_LOGGING = [
     "AWS_XRAY_DAEMON_ADDRESS",
 ]
 
+# Ids only need to pair the start and end lines of one call within a process.
+function_ids = count(1)
+
+
+class FunctionMemoStack(local):
+    # Threads nest their own calls; one shared list would interleave them.
+    def __init__(self):
+        # None marks a call whose memo list has not been needed yet.
+        self.frames: List[Optional[list]] = []
+
+
+function_memo = FunctionMemoStack()
+
 
 @dataclass(frozen=True)
 class DummyContext:
@@ -39,17 +53,18 @@ class MyLogger(object):
     logger: Logger
     borg_data = BorgData()
     borg_default_function = BorgDefaultFunctions()
-    stack_function_memo: List[list] = []
 
     def __init__(self, name: str):
-        file_path = os.path.join(
-            os.path.dirname(os.path.realpath(__file__)), "logging.json"
-        )
-        logging.config.dictConfig(json.load(open(file_path)))
+        configure_logging()
         self.logger = getLogger(name)
 
+    @property
+    def stack_function_memo(self) -> List[Optional[list]]:
+        return function_memo.frames
+
     def set_shared_data(self, key: str, value: Any):
         self.borg_data.data[key] = value
+        self.borg_data.version += 1
 
     def has_shared_data(self, key) -> bool:
         return key in self.borg_data.data
@@ -57,18 +72,23 @@ class MyLogger(object):
     def remove_shared_data(self, key):
         if key in self.borg_data.data:
             del self.borg_data.data[key]
+            self.borg_data.version += 1
 
     def add_default_function(self, func: CustomDefaultFunction):
         self.borg_default_function.functions.append(func)
 
+    def register_default_function(self, cls: type, func: DefaultConverter):
+        self.borg_default_function.register(cls, func)
+
     def add_functional_data(self, key: str, value: Any):
-        if len(self.stack_function_memo) == 0:
-            return
-        node = self.stack_function_memo[-1]
-        if not isinstance(node, list):
+        stack = function_memo.frames
+        if len(stack) == 0:
             return
+        node = stack[-1]
+        if node is None:
+            node = []
+            stack[-1] = node
         node.append({"key": key, "value": value})
-        self.stack_function_memo[-1] = node
 
     def info(self, msg: str, *args, **kwargs):
         self.logger.info(msg, *args, exc_info=True, extra={"additional_data": kwargs})
@@ -129,58 +149,117 @@ class MyLogger(object):
 
         return wrapper
 
+    def log_function_end(
+        self,
+        name: str,
+        func_id: str,
+        start: int,
+        memo: Optional[list],
+        is_succeed: bool,
+        args: tuple,
+        kwargs: dict,
+        result: Any = None,
+        with_result: bool = False,
+    ):
+        elapsed = perf_counter_ns() - start
+        status = "success" if is_succeed else "failed"
+        log_end_options = {
+            "func_id": func_id,
+            "function_name": name,
+            "is_succeed": is_succeed,
+            "duration": elapsed / 1e9,
+            "memo": [] if memo is None else memo,
+        }
+        if with_result:
+            log_end_options["result"] = result
+        if not is_succeed:
+            log_end_options["args"] = args
+            log_end_options["kwargs"] = kwargs
+        duration = timedelta(microseconds=elapsed // 1000)
+        msg = f"function {name} end ({status}) ({func_id}) (Duration: {duration})"
+        self.debug(msg, **log_end_options)
+
     def logging_function(
         self, with_arg: bool = False, with_return: bool = False, write_log: bool = False
     ) -> Callable:
+        logger = self.logger
+
         def wrapper(func) -> Callable:
+            name = func.__name__
+
+            if not write_log:
+                # Successful calls log nothing, so only failures pay for ids,
+                # timestamps and option dicts.
+                @wraps(func)
+                def process(*args, **kwargs):
+                    stack = function_memo.frames
+                    stack.append(None)
+                    start = perf_counter_ns()
+                    try:
+                        return func(*args, **kwargs)
+                    except Exception:
+                        if logger.isEnabledFor(DEBUG):
+                            self.log_function_end(
+                                name,
+                                str(next(function_ids)),
+                                start,
+                                stack[-1],
+                                False,
+                                args,
+                                kwargs,
+                            )
+                        raise
+                    finally:
+                        stack.pop()
+
+                return process
+
             @wraps(func)
-            def process(*args, **kwargs):
-                func_id = str(uuid4())
-                name = func.__name__
-                self.stack_function_memo.append([])
+            def process_with_log(*args, **kwargs):
+                stack = function_memo.frames
+                if not logger.isEnabledFor(DEBUG):
+                    stack.append(None)
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        stack.pop()
 
-                log_start_options = {"func_id": func_id, "function_name": name}
+                func_id = str(next(function_ids))
+                stack.append([])
+                log_start_options = {
+                    "func_id": func_id,
+                    "function_name": name,
+                    "memo": [[] if x is None else list(x) for x in stack],
+                }
                 if with_arg:
                     log_start_options["args"] = args
                     log_start_options["kwargs"] = kwargs
-                if write_log:
-                    log_start_options["memo"] = self.stack_function_memo
-                    self.debug(
-                        f"function {name} start ({func_id})", **log_start_options
-                    )
+                self.debug(f"function {name} start ({func_id})", **log_start_options)
 
-                result = None
-                is_succeed = True
-                dt_start = datetime.now()
+                start = perf_counter_ns()
                 try:
                     result = func(*args, **kwargs)
-                    return result
                 except Exception:
-                    is_succeed = False
+                    self.log_function_end(
+                        name, func_id, start, stack[-1], False, args, kwargs
+                    )
                     raise
+                else:
+                    self.log_function_end(
+                        name,
+                        func_id,
+                        start,
+                        stack[-1],
+                        True,
+                        args,
+                        kwargs,
+                        result,
+                        with_return,
+                    )
+                    return result
                 finally:
-                    dt_end = datetime.now()
-                    delta_duration = dt_end - dt_start
-                    memo = self.stack_function_memo[-1]
-                    del self.stack_function_memo[-1]
-                    status = "success" if is_succeed else "failed"
-                    log_end_options = {
-                        "func_id": func_id,
-                        "function_name": name,
-                        "is_succeed": is_succeed,
-                        "duration": delta_duration.total_seconds(),
-                        "memo": memo,
-                    }
-
-                    if with_return and is_succeed:
-                        log_end_options["result"] = result
-                    if write_log or not is_succeed:
-                        msg = f"function {name} end ({status}) ({func_id}) (Duration: {delta_duration})"
-                        if not is_succeed:
-                            log_end_options["args"] = args
-                            log_end_options["kwargs"] = kwargs
-                        self.debug(msg, **log_end_options)
+                    stack.pop()
 
-            return process
+            return process_with_log
 
         return wrapper
@@ -1 +1,13 @@
-from .article import Article, ParsedArticleData, StateArticle
+from .article import (
+    Article,
+    ArticleExistsError,
+    BatchGetResult,
+    ParsedArticleData,
+    StateArticle,
+    TransitionConflictError,
+    UnprocessedItemsError,
+    decode_attribute_value,
+    encode_attribute_value,
+)
+from .cache import ArticleCache, CacheStats
+from .session import ArticleSession, FailedWrite, FlushResult, SessionCommitError
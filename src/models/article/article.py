@@ -1,18 +1,83 @@
 from __future__ import annotations
 
-import json
-from dataclasses import asdict, dataclass, field
+import heapq
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from decimal import Decimal
 from enum import Enum
-from typing import List, Optional
+from functools import partial
+from inspect import ismethod
+from operator import attrgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from zlib import crc32
 
-from boto3.dynamodb.conditions import ConditionBase, Key
-from mypy_boto3_dynamodb.service_resource import Table
+from boto3.dynamodb.conditions import Attr, ConditionBase, Key
+from botocore.exceptions import ClientError
 
 from logger import MyLogger
-from utils.datetime import now
+from utils.aws import get_dynamodb_client
+from utils.datetime import now, parse_epoch_ms, to_epoch_ms
+from utils.retry import sleep_with_backoff
+from utils.slots import add_slots
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_dynamodb.type_defs import QueryOutputTableTypeDef
 
 logger = MyLogger(__name__)
 
+WriteListener = Callable[[str, List[str]], None]
+write_listeners: List[weakref.ReferenceType] = []
+
+ArticleState = Tuple[Any, ...]
+
+BATCH_GET_SIZE = 100
+TRANSACT_WRITE_SIZE = 25
+BATCH_MAX_RETRY = 8
+BATCH_GET_WORKERS = 4
+INSERT_WORKERS = 8
+# Changing the shard count requires rewriting status_shard on every item.
+STATUS_SHARD_COUNT = 8
+STATUS_SHARD_INDEX = "status-shard-index"
+STATUS_UPDATED_INDEX = "status-updated-index"
+
+
+class UnprocessedItemsError(Exception):
+    def __init__(self, items: List[dict]):
+        super().__init__(f"{len(items)} items remain unprocessed")
+        self.items = items
+
+
+class TransitionConflictError(Exception):
+    def __init__(
+        self, url: str, expected_status: StateArticle, expected_version: Optional[int]
+    ):
+        super().__init__(
+            f"{url} is not {StateArticle(expected_status).value}"
+            + ("" if expected_version is None else f" at version {expected_version}")
+        )
+        self.url = url
+        self.expected_status = expected_status
+        self.expected_version = expected_version
+
+
+class ArticleExistsError(Exception):
+    def __init__(self, url: str):
+        super().__init__(f"{url} already exists")
+        self.url = url
+
 
 class StateArticle(str, Enum):
     Inserted = "inserted"
@@ -27,6 +92,7 @@ class ParsedArticleData:
     thumbnail: str
 
 
+@add_slots(extra=("_dirty", "_appended"))
 @dataclass()
 class Article:
     url: str
@@ -38,16 +104,92 @@ class Article:
     title_ja: Optional[str] = field(default=None)
     category: Optional[str] = field(default=None)
     thumbnail: Optional[str] = field(default=None)
+    status_shard: str = field(default="")
+    created_at_ms: int = field(default=0)
+    updated_at_ms: int = field(default=0)
+    version: int = field(default=0)
+
+    if TYPE_CHECKING:
+        # Fields changed by the mutators since the last load or write; None
+        # while never written. Direct assignments are not tracked.
+        _dirty: Optional[FrozenSet[str]]
+        # Messages appended since then, or -1 once the list was replaced.
+        _appended: int
 
     def __post_init__(self):
-        txt_now = str(now())
-        if self.created_at == "":
-            self.created_at = txt_now
-        if self.updated_at == "":
-            self.updated_at = txt_now
+        if self.created_at == "" or self.updated_at == "":
+            txt_now = str(now())
+            if self.created_at == "":
+                self.created_at = txt_now
+            if self.updated_at == "":
+                self.updated_at = txt_now
+        if self.status_shard == "":
+            self.status_shard = Article.build_status_shard(self.status, self.url)
+        if self.created_at_ms == 0:
+            self.created_at_ms = parse_epoch_ms(self.created_at)
+        elif type(self.created_at_ms) is not int:
+            self.created_at_ms = int(self.created_at_ms)
+        if self.updated_at_ms == 0:
+            self.updated_at_ms = parse_epoch_ms(self.updated_at)
+        elif type(self.updated_at_ms) is not int:
+            self.updated_at_ms = int(self.updated_at_ms)
+        if type(self.version) is not int:
+            self.version = int(self.version)
+        # Only articles read from the table start clean; see from_item.
+        self._dirty = None
+        self._appended = 0
 
     def __hash__(self):
-        return hash(json.dumps(asdict(self)))
+        return hash(self._state())
+
+    def _touch(self):
+        current = now()
+        self.updated_at = str(current)
+        self.updated_at_ms = to_epoch_ms(current)
+        self._mark_dirty("updated_at", "updated_at_ms")
+
+    def _mark_dirty(self, *names: str):
+        if self._dirty is not None:
+            self._dirty = self._dirty.union(names)
+
+    def _state(self) -> ArticleState:
+        return (*scalar_values(self), tuple(self.error_messages))
+
+    def to_attribute_values(self) -> Dict[str, Any]:
+        return {
+            k: encode_attribute_value(v)
+            for k, v in zip(ARTICLE_FIELDS, field_values(self))
+        }
+
+    def to_next_attribute_values(self) -> Dict[str, Any]:
+        item = self.to_attribute_values()
+        item["version"] = encode_attribute_value(self.version + 1)
+        return item
+
+    @staticmethod
+    def from_item(item: Dict[str, Any]) -> Article:
+        article = Article(**item)
+        article.mark_clean()
+        return article
+
+    @staticmethod
+    def from_attribute_values(item: Dict[str, Any]) -> Article:
+        return Article.from_item(
+            {
+                k: decode_attribute_value(v)
+                for k, v in item.items()
+                if k in ARTICLE_FIELD_SET
+            }
+        )
+
+    @staticmethod
+    def build_status_shard(status: StateArticle, url: str) -> str:
+        shard = crc32(url.encode()) % STATUS_SHARD_COUNT
+        return f"{StateArticle(status).value}#{shard}"
+
+    @staticmethod
+    def build_status_shards(status: StateArticle) -> List[str]:
+        return [f"{StateArticle(status).value}#{x}" for x in range(STATUS_SHARD_COUNT)]
 
     @staticmethod
     @logger.logging_function()
@@ -59,8 +201,11 @@ class Article:
 
     @logger.logging_function(write_log=True)
     def append_error_message(self, message: str):
-        self.updated_at = str(now())
+        self._touch()
         self.error_messages.append(message)
+        self._mark_dirty("error_messages")
+        if self._appended >= 0:
+            self._appended += 1
         logger.add_functional_data("updated", self)
 
     @logger.logging_function()
@@ -70,12 +215,15 @@ class Article:
     @logger.logging_function(write_log=True)
     def update_to_informed(self, data: ParsedArticleData):
         self.status = StateArticle.Informed
-        self.updated_at = str(now())
+        self.status_shard = Article.build_status_shard(self.status, self.url)
+        self._touch()
         self.error_messages = []
         self.title = data.title
         self.title_ja = data.title_ja
         self.category = data.category
         self.thumbnail = data.thumbnail
+        self._mark_dirty(*INFORMED_FIELDS)
+        self._appended = -1
 
         logger.add_functional_data("updated", self)
 
@@ -83,40 +231,668 @@ class Article:
     def put_item(
         self, table: Table, condition_expression: Optional[ConditionBase] = None
     ):
-        option: dict = {"Item": asdict(self)}
+        item = asdict(self)
+        item["version"] = self.version + 1
+        if condition_expression is None:
+            # A stale copy must not reset the version a newer write produced.
+            condition_expression = (
+                Attr("version").eq(self.version) | Attr("version").not_exists()
+            )
+        option: dict = {
+            "TableName": table.name,
+            "Item": item,
+            "ConditionExpression": condition_expression,
+        }
+        # Table resources are not thread-safe; their client is.
+        client: Any = table.meta.client
+        try:
+            client.put_item(**option)
+        finally:
+            notify_write(table, [self.url])
+        self.version = item["version"]
+        self.mark_clean()
+
+    @staticmethod
+    @logger.logging_function(write_log=True)
+    def insert_items(articles: List[Article], table: Table) -> List[Article]:
+        chunks = [
+            articles[i : i + TRANSACT_WRITE_SIZE]
+            for i in range(0, len(articles), TRANSACT_WRITE_SIZE)
+        ]
+        if len(chunks) == 0:
+            return []
+        workers = min(INSERT_WORKERS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda x: Article.insert_chunk(x, table), chunks)
+            return [x for result in results for x in result]
+
+    @staticmethod
+    @logger.logging_function(write_log=True)
+    def insert_chunk(articles: List[Article], table: Table) -> List[Article]:
+        # One transaction never overwrites an existing url. An existing url
+        # cancels the whole transaction, so the rest is sent again without it.
+        client = get_attribute_value_client(table)
+        pending = articles
+        attempt = 0
+        try:
+            while len(pending) > 0:
+                try:
+                    client.transact_write_items(
+                        TransactItems=[
+                            {
+                                "Put": {
+                                    "TableName": table.name,
+                                    "Item": x.to_next_attribute_values(),
+                                    "ConditionExpression": "attribute_not_exists(#url)",
+                                    "ExpressionAttributeNames": {"#url": "url"},
+                                }
+                            }
+                            for x in pending
+                        ]
+                    )
+                    break
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "TransactionCanceledException":
+                        raise
+                    reasons = [x["Code"] for x in e.response["CancellationReasons"]]
+                    exists = [x == "ConditionalCheckFailed" for x in reasons]
+                    if not any(exists):
+                        # Conflicts with other writes or throttling; retry as is.
+                        if attempt >= BATCH_MAX_RETRY:
+                            raise
+                        sleep_with_backoff(attempt)
+                        attempt += 1
+                    pending = [x for x, ok in zip(pending, exists) if not ok]
+        finally:
+            notify_write(table, [x.url for x in articles])
+        for x in pending:
+            x.version += 1
+            x.mark_clean()
+        return pending
+
+    @logger.logging_function()
+    def get_dirty_fields(self) -> Set[str]:
+        if self._dirty is None:
+            return set(ARTICLE_FIELDS)
+        return set(self._dirty)
+
+    @logger.logging_function()
+    def get_appended_errors(self) -> Optional[List[Optional[str]]]:
+        # Messages added after the last write, or None if the list was replaced.
+        if self._dirty is None or self._appended < 0:
+            return None
+        return self.error_messages[len(self.error_messages) - self._appended :]
+
+    @logger.logging_function()
+    def mark_clean(self):
+        self._dirty = CLEAN_FIELDS
+        self._appended = 0
+
+    @logger.logging_function(write_log=True)
+    def save(self, table: Table, condition_expression: Optional[ConditionBase] = None):
+        dirty = self.get_dirty_fields()
+        names: Dict[str, str] = {}
+        values: Dict[str, Any] = {}
+        actions: List[str] = []
+        for i, name in enumerate(ARTICLE_FIELDS):
+            if name in ("url", "version") or name not in dirty:
+                continue
+            # boto3 conditions claim the #n/:v placeholders, so avoid them here.
+            names[f"#a{i}"] = name
+            appended = self.get_appended_errors() if name == "error_messages" else None
+            if appended is None:
+                values[f":a{i}"] = getattr(self, name)
+                actions.append(f"#a{i} = :a{i}")
+            else:
+                values[f":a{i}"] = appended
+                values[":empty"] = []
+                actions.append(
+                    f"#a{i} = list_append(if_not_exists(#a{i}, :empty), :a{i})"
+                )
+        if len(actions) == 0:
+            return
+
+        names["#version"] = "version"
+        values[":zero"] = 0
+        values[":one"] = 1
+        actions.append("#version = if_not_exists(#version, :zero) + :one")
+
+        option: dict = {
+            "TableName": table.name,
+            "Key": {"url": self.url},
+            "UpdateExpression": "SET " + ", ".join(actions),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+            "ReturnValues": "UPDATED_NEW",
+        }
         if condition_expression is not None:
             option["ConditionExpression"] = condition_expression
-        table.put_item(**option)
+        client: Any = table.meta.client
+        try:
+            resp = client.update_item(**option)
+        finally:
+            notify_write(table, [self.url])
+        self.version = int(resp["Attributes"]["version"])
+        self.mark_clean()
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True, with_arg=True)
+    def transition_to_informed(
+        url: str,
+        data: ParsedArticleData,
+        table: Table,
+        expected_version: Optional[int] = None,
+    ) -> Article:
+        return Article._transition(
+            url,
+            table,
+            StateArticle.Inserted,
+            expected_version,
+            {
+                "status": StateArticle.Informed.value,
+                "status_shard": Article.build_status_shard(StateArticle.Informed, url),
+                "error_messages": [],
+                "title": data.title,
+                "title_ja": data.title_ja,
+                "category": data.category,
+                "thumbnail": data.thumbnail,
+            },
+        )
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True, with_arg=True)
+    def record_error(
+        url: str,
+        message: str,
+        table: Table,
+        expected_status: StateArticle = StateArticle.Inserted,
+        expected_version: Optional[int] = None,
+    ) -> Article:
+        return Article._transition(
+            url, table, expected_status, expected_version, {}, [message]
+        )
+
+    @staticmethod
+    def _transition(
+        url: str,
+        table: Table,
+        expected_status: StateArticle,
+        expected_version: Optional[int],
+        values: Dict[str, Any],
+        errors: Optional[List[str]] = None,
+    ) -> Article:
+        current = now()
+        values = {
+            **values,
+            "updated_at": str(current),
+            "updated_at_ms": to_epoch_ms(current),
+        }
+        names = {f"#a{i}": k for i, k in enumerate(values)}
+        option_values = {f":a{i}": v for i, v in enumerate(values.values())}
+        actions = [f"#a{i} = :a{i}" for i in range(len(values))]
+        names["#version"] = "version"
+        option_values[":zero"] = 0
+        option_values[":one"] = 1
+        actions.append("#version = if_not_exists(#version, :zero) + :one")
+        if errors is not None:
+            names["#errors"] = "error_messages"
+            option_values[":errors"] = errors
+            option_values[":empty"] = []
+            actions.append(
+                "#errors = list_append(if_not_exists(#errors, :empty), :errors)"
+            )
+
+        condition: ConditionBase = Attr("status").eq(
+            StateArticle(expected_status).value
+        )
+        if expected_version is not None:
+            version: ConditionBase = Attr("version").eq(expected_version)
+            if expected_version == 0:
+                # Items written before versioning have no version attribute.
+                version = version | Attr("version").not_exists()
+            condition = condition & version
+
+        try:
+            resp = table.update_item(
+                Key={"url": url},
+                UpdateExpression="SET " + ", ".join(actions),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=option_values,
+                ReturnValues="ALL_NEW",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            raise TransitionConflictError(url, expected_status, expected_version)
+        finally:
+            notify_write(table, [url])
+        item: dict = resp["Attributes"]
+        return Article.from_item(item)
 
     @staticmethod
     @logger.logging_function(write_log=True, with_return=True, with_arg=True)
     def get_item(url: str, table: Table) -> Article:
         resp = table.get_item(Key={"url": url})
         item: dict = resp["Item"]
-        return Article(**item)
+        return Article.from_item(item)
 
     @staticmethod
     @logger.logging_function(write_log=True, with_arg=True)
     def query(
         status: StateArticle, table: Table, limit: Optional[int] = None
     ) -> List[Article]:
-        result: List[dict] = []
+        shards = Article.build_status_shards(status)
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            results = executor.map(
+                lambda x: list(
+                    Article.iter_query_shard(x, table, page_size=limit, prefetch=False)
+                ),
+                shards,
+            )
+            return [Article.from_item(x) for result in results for x in result]
 
-        token = None
-        is_first = True
-        while token is not None or is_first:
-            if is_first:
-                is_first = False
-            option: dict = {
-                "IndexName": "status-index",
-                "KeyConditionExpression": Key("status").eq(status),
+    @staticmethod
+    @logger.logging_function(write_log=True, with_arg=True)
+    def iter_query(
+        status: StateArticle,
+        table: Table,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        prefetch: bool = True,
+    ) -> Iterator[Article]:
+        for item in Article.iter_query_items(
+            status, table, limit, page_size, None, prefetch
+        ):
+            yield Article.from_item(item)
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_arg=True)
+    def iter_query_items(
+        status: StateArticle,
+        table: Table,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        remaining = limit
+        for shard in Article.build_status_shards(status):
+            if remaining == 0:
+                return
+            for item in Article.iter_query_shard(
+                shard, table, remaining, page_size, projection, prefetch
+            ):
+                if remaining is not None:
+                    remaining -= 1
+                yield item
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_arg=True)
+    def iter_query_shard(
+        status_shard: str,
+        table: Table,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+        prefetch: bool = True,
+    ) -> Iterator[dict]:
+        if limit == 0:
+            return
+        # Shards and prefetches run in threads, so go through the client.
+        client: Any = table.meta.client
+        option: dict = {
+            "TableName": table.name,
+            "IndexName": STATUS_SHARD_INDEX,
+            "KeyConditionExpression": Key("status_shard").eq(status_shard),
+        }
+        if projection is not None:
+            # url and status are always fetched to identify the item. Projected
+            # items stay dicts; Article would fill the rest with defaults.
+            names = list(dict.fromkeys(["url", "status", *projection]))
+            option["ProjectionExpression"] = ", ".join(
+                f"#p{i}" for i in range(len(names))
+            )
+            option["ExpressionAttributeNames"] = {
+                f"#p{i}": x for i, x in enumerate(names)
             }
+
+        def fetch(
+            token: Optional[dict], remaining: Optional[int]
+        ) -> QueryOutputTableTypeDef:
+            page = dict(option)
             if token is not None:
+                page["ExclusiveStartKey"] = token
+            size = page_size
+            if remaining is not None:
+                size = remaining if size is None else min(size, remaining)
+            if size is not None:
+                page["Limit"] = size
+            return client.query(**page)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        def request(
+            token: Optional[dict], remaining: Optional[int]
+        ) -> Callable[[], QueryOutputTableTypeDef]:
+            if executor is None:
+                return partial(fetch, token, remaining)
+            return executor.submit(fetch, token, remaining).result
+
+        try:
+            remaining = limit
+            pending: Optional[Callable[[], QueryOutputTableTypeDef]] = request(
+                None, remaining
+            )
+            while pending is not None:
+                resp = pending()
+                items: List[dict] = resp.get("Items", [])
+                if remaining is not None:
+                    items = items[:remaining]
+                    remaining -= len(items)
+                token = resp.get("LastEvaluatedKey")
+                pending = None
+                if token is not None and remaining != 0:
+                    pending = request(token, remaining)
+                yield from items
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_arg=True)
+    def query_updated_since(
+        status: StateArticle,
+        table: Table,
+        since_ms: int,
+        until_ms: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Article]:
+        condition = (
+            Key("updated_at_ms").gte(since_ms)
+            if until_ms is None
+            else Key("updated_at_ms").between(since_ms, until_ms)
+        )
+        return Article._query_updated_range(status, table, condition, None, limit)
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_arg=True)
+    def query_created_since(
+        status: StateArticle,
+        table: Table,
+        since_ms: int,
+        limit: Optional[int] = None,
+    ) -> List[Article]:
+        # created_at <= updated_at, so the sort key bounds the read and the
+        # filter drops items that were only updated in the range.
+        return Article._query_updated_range(
+            status,
+            table,
+            Key("updated_at_ms").gte(since_ms),
+            Attr("created_at_ms").gte(since_ms),
+            limit,
+        )
+
+    @staticmethod
+    def _query_updated_range(
+        status: StateArticle,
+        table: Table,
+        condition: ConditionBase,
+        filter_expression: Optional[ConditionBase],
+        limit: Optional[int],
+    ) -> List[Article]:
+        client: Any = table.meta.client
+
+        def read(status_shard: str) -> List[Article]:
+            result: List[Article] = []
+            option: dict = {
+                "TableName": table.name,
+                "IndexName": STATUS_UPDATED_INDEX,
+                "KeyConditionExpression": Key("status_shard").eq(status_shard)
+                & condition,
+            }
+            if filter_expression is not None:
+                option["FilterExpression"] = filter_expression
+            while True:
+                resp = client.query(**option)
+                items: List[dict] = resp.get("Items", [])
+                result += [Article.from_item(x) for x in items]
+                token = resp.get("LastEvaluatedKey")
+                # Shards are sorted, so each needs at most limit items.
+                if token is None or (limit is not None and len(result) >= limit):
+                    return result
                 option["ExclusiveStartKey"] = token
-            if limit is not None:
-                option["Limit"] = limit
-            resp = table.query(**option)
-            result += resp.get("Items", [])
+
+        shards = Article.build_status_shards(status)
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            results = list(executor.map(read, shards))
+        merged = list(heapq.merge(*results, key=attrgetter("updated_at_ms")))
+        return merged if limit is None else merged[:limit]
+
+    @staticmethod
+    def _batch_get(keys: List[str], table: Table, option: dict) -> List[dict]:
+        result: List[dict] = []
+        client: Any = table.meta.client
+        request: dict = {**option, "Keys": [{"url": x} for x in keys]}
+        attempt = 0
+        while True:
+            resp = client.batch_get_item(RequestItems={table.name: request})
+            result += resp.get("Responses", {}).get(table.name, [])
+            unprocessed = resp.get("UnprocessedKeys", {}).get(table.name)
+            if unprocessed is None:
+                return result
+            request = unprocessed
+            if attempt >= BATCH_MAX_RETRY:
+                raise UnprocessedItemsError(request["Keys"])
+            sleep_with_backoff(attempt)
+            attempt += 1
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True)
+    def get_existing_urls(urls: List[str], table: Table) -> Set[str]:
+        result: Set[str] = set()
+        option = {
+            "ProjectionExpression": "#url",
+            "ExpressionAttributeNames": {"#url": "url"},
+        }
+        for i in range(0, len(urls), BATCH_GET_SIZE):
+            items = Article._batch_get(urls[i : i + BATCH_GET_SIZE], table, option)
+            result |= {x["url"] for x in items}
+        return result
+
+    @staticmethod
+    @logger.logging_function(write_log=True)
+    def get_many(urls: List[str], table: Table) -> BatchGetResult:
+        keys = list(dict.fromkeys(urls))
+        chunks = [
+            keys[i : i + BATCH_GET_SIZE] for i in range(0, len(keys), BATCH_GET_SIZE)
+        ]
+        found: Dict[str, Article] = {}
+        if len(chunks) > 0:
+            workers = min(BATCH_GET_WORKERS, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for items in executor.map(
+                    lambda x: Article._batch_get(x, table, {}), chunks
+                ):
+                    for item in items:
+                        found[item["url"]] = Article.from_item(item)
+        return BatchGetResult(
+            articles=[found[x] for x in keys if x in found],
+            missing=[x for x in keys if x not in found],
+        )
+
+    @staticmethod
+    @logger.logging_function()
+    def add_write_listener(listener: WriteListener):
+        ref: weakref.ReferenceType = (
+            weakref.WeakMethod(listener)
+            if ismethod(listener)
+            else weakref.ref(listener)
+        )
+        write_listeners.append(ref)
+
+    @staticmethod
+    @logger.logging_function(write_log=True)
+    def scan_urls(table: Table) -> Iterator[str]:
+        option: dict = {
+            "ProjectionExpression": "#url",
+            "ExpressionAttributeNames": {"#url": "url"},
+        }
+        while True:
+            resp = table.scan(**option)
+            items: List[dict] = resp.get("Items", [])
+            for item in items:
+                yield item["url"]
+            token = resp.get("LastEvaluatedKey")
+            if token is None:
+                break
+            option["ExclusiveStartKey"] = token
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True)
+    def backfill_index_keys(table: Table) -> int:
+        count = 0
+        option: dict = {
+            "FilterExpression": Attr("status_shard").not_exists()
+            | Attr("updated_at_ms").not_exists(),
+            "ProjectionExpression": "#url, #status, #created, #updated",
+            "ExpressionAttributeNames": {
+                "#url": "url",
+                "#status": "status",
+                "#created": "created_at",
+                "#updated": "updated_at",
+            },
+        }
+        while True:
+            resp = table.scan(**option)
+            items: List[dict] = resp.get("Items", [])
+            updated: List[str] = []
+            try:
+                for item in items:
+                    if Article.backfill_item(item, table):
+                        updated.append(item["url"])
+            finally:
+                if len(updated) > 0:
+                    notify_write(table, updated)
+            count += len(updated)
             token = resp.get("LastEvaluatedKey")
+            if token is None:
+                break
+            option["ExclusiveStartKey"] = token
+        return count
 
-        return [Article(**x) for x in result]
+    @staticmethod
+    @logger.logging_function()
+    def backfill_item(item: dict, table: Table) -> bool:
+        try:
+            table.update_item(
+                Key={"url": item["url"]},
+                UpdateExpression=(
+                    "SET #shard = :shard, #created_ms = :created_ms,"
+                    " #updated_ms = :updated_ms,"
+                    " #version = if_not_exists(#version, :zero) + :one"
+                ),
+                ConditionExpression="#status = :status AND #updated = :updated",
+                ExpressionAttributeNames={
+                    "#shard": "status_shard",
+                    "#created_ms": "created_at_ms",
+                    "#updated_ms": "updated_at_ms",
+                    "#status": "status",
+                    "#updated": "updated_at",
+                    "#version": "version",
+                },
+                ExpressionAttributeValues={
+                    ":shard": Article.build_status_shard(item["status"], item["url"]),
+                    ":created_ms": parse_epoch_ms(item["created_at"]),
+                    ":updated_ms": parse_epoch_ms(item["updated_at"]),
+                    ":status": item["status"],
+                    ":updated": item["updated_at"],
+                    ":zero": 0,
+                    ":one": 1,
+                },
+            )
+        except ClientError as e:
+            # The item changed concurrently; that write set the keys.
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return False
+        return True
+
+
+def get_attribute_value_client(table: Table) -> Any:
+    # The resource client serializes Python values itself, so items already
+    # encoded by the codec go through a plain client on the same endpoint.
+    meta = table.meta.client.meta
+    return get_dynamodb_client(meta.endpoint_url, meta.region_name)
+
+
+def notify_write(table: Table, urls: List[str]):
+    for ref in list(write_listeners):
+        listener = ref()
+        if listener is None:
+            if ref in write_listeners:
+                write_listeners.remove(ref)
+            continue
+        listener(table.name, urls)
+
+
+ARTICLE_FIELDS = tuple(x.name for x in fields(Article))
+ARTICLE_FIELD_SET = frozenset(ARTICLE_FIELDS)
+SCALAR_FIELDS = tuple(x for x in ARTICLE_FIELDS if x != "error_messages")
+INFORMED_FIELDS = (
+    "status",
+    "status_shard",
+    "error_messages",
+    "title",
+    "title_ja",
+    "category",
+    "thumbnail",
+)
+CLEAN_FIELDS: FrozenSet[str] = frozenset()
+field_values = attrgetter(*ARTICLE_FIELDS)
+scalar_values = attrgetter(*SCALAR_FIELDS)
+
+
+def encode_attribute_value(value: Any) -> Dict[str, Any]:
+    # str subclasses such as StateArticle go out as their string value.
+    if isinstance(value, str):
+        return {"S": value}
+    if value is None:
+        return {"NULL": True}
+    if type(value) is list:
+        return {"L": [encode_attribute_value(x) for x in value]}
+    if isinstance(value, Enum):
+        return encode_attribute_value(value.value)
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, Decimal)):
+        return {"N": str(value)}
+    if isinstance(value, dict):
+        return {"M": {k: encode_attribute_value(v) for k, v in value.items()}}
+    raise TypeError(f"Unsupported type {type(value)} for value {value}")
+
+
+def decode_attribute_value(value: Dict[str, Any]) -> Any:
+    if "S" in value:
+        return value["S"]
+    if "NULL" in value:
+        return None
+    if "L" in value:
+        return [decode_attribute_value(x) for x in value["L"]]
+    if "N" in value:
+        return Decimal(value["N"])
+    if "BOOL" in value:
+        return value["BOOL"]
+    if "M" in value:
+        return {k: decode_attribute_value(v) for k, v in value["M"].items()}
+    raise TypeError(f"Unsupported attribute value {value}")
+
+
+def decode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: decode_attribute_value(v) for k, v in item.items()}
+
+
+@dataclass()
+class BatchGetResult:
+    articles: List[Article]
+    missing: List[str]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from logger import MyLogger
+
+from .article import Article, BatchGetResult, StateArticle
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+logger = MyLogger(__name__)
+
+ARTICLE_CACHE_SIZE = 1024
+ARTICLE_CACHE_TTL = 60.0
+
+# Entries hold the encoded item so callers always get a fresh Article.
+CacheEntry = Tuple[float, Any]
+
+
+@dataclass()
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class ArticleCache(object):
+    items: OrderedDict[Tuple[str, str], CacheEntry]
+    queries: OrderedDict[Tuple[str, str, Optional[int]], CacheEntry]
+    max_size: int
+    ttl: float
+    stats: CacheStats
+    generation: int
+    lock: Lock
+
+    def __init__(
+        self,
+        max_size: int = ARTICLE_CACHE_SIZE,
+        ttl: float = ARTICLE_CACHE_TTL,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.items = OrderedDict()
+        self.queries = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self.generation = 0
+        self.lock = Lock()
+        Article.add_write_listener(self.invalidate)
+
+    def _lookup(self, store: OrderedDict, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            entry = store.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del store[key]
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            store.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def _store(self, store: OrderedDict, key: Hashable, value: Any, generation: int):
+        with self.lock:
+            # A write since the read started may have made the value stale.
+            if generation != self.generation:
+                return
+            store[key] = (self.clock() + self.ttl, value)
+            store.move_to_end(key)
+            while len(store) > self.max_size:
+                store.popitem(last=False)
+                self.stats.evictions += 1
+
+    @logger.logging_function(with_arg=True)
+    def get_item(self, url: str, table: Table) -> Article:
+        key = (table.name, url)
+        value = self._lookup(self.items, key)
+        if value is not None:
+            return Article.from_attribute_values(value)
+        generation = self.generation
+        article = Article.get_item(url, table)
+        self._store(self.items, key, article.to_attribute_values(), generation)
+        return article
+
+    @logger.logging_function()
+    def get_many(self, urls: List[str], table: Table) -> BatchGetResult:
+        keys = list(dict.fromkeys(urls))
+        found: Dict[str, Article] = {}
+        for url in keys:
+            value = self._lookup(self.items, (table.name, url))
+            if value is not None:
+                found[url] = Article.from_attribute_values(value)
+
+        rest = [x for x in keys if x not in found]
+        missing: List[str] = []
+        if len(rest) > 0:
+            generation = self.generation
+            result = Article.get_many(rest, table)
+            for article in result.articles:
+                found[article.url] = article
+                self._store(
+                    self.items,
+                    (table.name, article.url),
+                    article.to_attribute_values(),
+                    generation,
+                )
+            missing = result.missing
+        return BatchGetResult(
+            articles=[found[x] for x in keys if x in found],
+            missing=missing,
+        )
+
+    @logger.logging_function(with_arg=True)
+    def query(
+        self, status: StateArticle, table: Table, limit: Optional[int] = None
+    ) -> List[Article]:
+        key = (table.name, StateArticle(status).value, limit)
+        value = self._lookup(self.queries, key)
+        if value is not None:
+            return [Article.from_attribute_values(x) for x in value]
+        generation = self.generation
+        articles = Article.query(status, table, limit)
+        self._store(
+            self.queries, key, [x.to_attribute_values() for x in articles], generation
+        )
+        return articles
+
+    @logger.logging_function()
+    def invalidate(self, table_name: str, urls: List[str]):
+        with self.lock:
+            self.generation += 1
+            for url in urls:
+                if self.items.pop((table_name, url), None) is not None:
+                    self.stats.invalidations += 1
+            # Any write can change a query result, so drop the table's queries.
+            for key in [x for x in self.queries if x[0] == table_name]:
+                del self.queries[key]
+                self.stats.invalidations += 1
+
+    @logger.logging_function()
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.items.clear()
+            self.queries.clear()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List
+
+from logger import MyLogger
+
+from .article import TRANSACT_WRITE_SIZE, Article, ArticleExistsError
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+
+logger = MyLogger(__name__)
+
+SESSION_BUFFER_SIZE = 100
+SESSION_MAX_WORKERS = 8
+
+
+@dataclass()
+class FailedWrite:
+    article: Article
+    error: Exception
+
+
+@dataclass()
+class FlushResult:
+    written: List[Article] = field(default_factory=list)
+    failed: List[FailedWrite] = field(default_factory=list)
+
+    def extend(self, other: FlushResult):
+        self.written += other.written
+        self.failed += other.failed
+
+
+class SessionCommitError(Exception):
+    def __init__(self, result: FlushResult):
+        super().__init__(f"{len(result.failed)} articles failed to be written")
+        self.result = result
+
+
+class ArticleSession(object):
+    table: Table
+    buffer_size: int
+    max_workers: int
+    inserts: Dict[str, Article]
+    updates: Dict[str, Article]
+    result: FlushResult
+    last_result: FlushResult
+
+    def __init__(
+        self,
+        table: Table,
+        buffer_size: int = SESSION_BUFFER_SIZE,
+        max_workers: int = SESSION_MAX_WORKERS,
+    ):
+        self.table = table
+        self.buffer_size = buffer_size
+        self.max_workers = max_workers
+        self.inserts = {}
+        self.updates = {}
+        self.result = FlushResult()
+        self.last_result = FlushResult()
+
+    def __enter__(self) -> ArticleSession:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+            if len(self.last_result.failed) > 0:
+                logger.warning(
+                    "session rolled back after failed writes",
+                    failed=[x.article.url for x in self.last_result.failed],
+                )
+            return
+        result = self.commit()
+        if len(result.failed) > 0:
+            raise SessionCommitError(result)
+
+    @logger.logging_function()
+    def add(self, article: Article):
+        self.updates.pop(article.url, None)
+        self.inserts[article.url] = article
+        self.flush_if_full()
+
+    @logger.logging_function()
+    def track(self, article: Article):
+        if article.url in self.inserts:
+            self.inserts[article.url] = article
+        else:
+            self.updates[article.url] = article
+        self.flush_if_full()
+
+    @logger.logging_function()
+    def pending_count(self) -> int:
+        return len(self.inserts) + len(self.updates)
+
+    @logger.logging_function()
+    def flush_if_full(self):
+        if self.pending_count() >= self.buffer_size:
+            self.flush()
+
+    @logger.logging_function(write_log=True)
+    def flush(self) -> FlushResult:
+        inserts = list(self.inserts.values())
+        updates = list(self.updates.values())
+        self.inserts = {}
+        self.updates = {}
+
+        result = FlushResult()
+        chunks = [
+            inserts[i : i + TRANSACT_WRITE_SIZE]
+            for i in range(0, len(inserts), TRANSACT_WRITE_SIZE)
+        ]
+        if len(chunks) + len(updates) == 0:
+            return result
+        workers = min(self.max_workers, len(chunks) + len(updates))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.write_inserts, x) for x in chunks]
+            futures += [executor.submit(self.write_update, x) for x in updates]
+            for future in futures:
+                result.extend(future.result())
+
+        logger.add_functional_data(
+            "flush", {"written": len(result.written), "failed": len(result.failed)}
+        )
+        self.result.extend(result)
+        return result
+
+    @logger.logging_function(write_log=True)
+    def commit(self) -> FlushResult:
+        self.flush()
+        self.last_result = self.result
+        self.result = FlushResult()
+        return self.last_result
+
+    @logger.logging_function(write_log=True)
+    def rollback(self):
+        self.inserts = {}
+        self.updates = {}
+        # Keep what earlier auto-flushes wrote or failed to write.
+        self.last_result = self.result
+        self.result = FlushResult()
+
+    def write_inserts(self, articles: List[Article]) -> FlushResult:
+        # A transaction fails as a whole, so an error fails the entire chunk.
+        try:
+            inserted = Article.insert_chunk(articles, self.table)
+        except Exception as e:
+            return FlushResult(failed=[FailedWrite(x, e) for x in articles])
+        urls = {x.url for x in inserted}
+        return FlushResult(
+            written=inserted,
+            failed=[
+                FailedWrite(x, ArticleExistsError(x.url))
+                for x in articles
+                if x.url not in urls
+            ],
+        )
+
+    def write_update(self, article: Article) -> FlushResult:
+        try:
+            article.save(self.table)
+        except Exception as e:
+            return FlushResult(failed=[FailedWrite(article, e)])
+        return FlushResult(written=[article])
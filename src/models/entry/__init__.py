@@ -0,0 +1,3 @@
+from .entry import EntrySummary, parse_category, parse_tags
+from .entry_filter import EntryFilter, FilterRules
+from .tag import TagSet, TagVocabulary
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import FrozenSet, Optional
+
+from logger import MyLogger
+
+from .tag import TagSet
+
+logger = MyLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EntrySummary:
+    link: str
+    title: str
+    summary: Optional[str]
+
+    @cached_property
+    def tags(self) -> TagSet:
+        # Parsed on first use; entries rejected by category never need it.
+        return TagSet.parse(self.summary)
+
+
+def _parse_category(title: str) -> str:
+    index = title.find("]")
+    return title[1:index]
+
+
+@logger.logging_function()
+def parse_category(title: str) -> str:
+    return _parse_category(title)
+
+
+@logger.logging_function()
+def parse_tags(summary: Optional[str]) -> FrozenSet[str]:
+    return frozenset(TagSet.parse(summary))
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, TypeVar
+
+from logger import MyLogger
+
+from .entry import EntrySummary, _parse_category
+from .tag import TagSet, leading_values, pack_tag, vocabulary
+
+logger = MyLogger(__name__)
+
+T = TypeVar("T", bound=EntrySummary)
+
+
+@dataclass(frozen=True)
+class FilterRules:
+    categories: FrozenSet[str] = field(default_factory=frozenset)
+    include_tags: FrozenSet[str] = field(default_factory=frozenset)
+    exclude_tags: FrozenSet[str] = field(default_factory=frozenset)
+    namespace_allowlists: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+
+    @staticmethod
+    @logger.logging_function(with_arg=True)
+    def from_dict(data: dict) -> FilterRules:
+        return FilterRules(
+            categories=frozenset(data.get("categories", [])),
+            include_tags=validate_tags(data.get("include_tags", [])),
+            exclude_tags=validate_tags(data.get("exclude_tags", [])),
+            namespace_allowlists={
+                k: frozenset(v) for k, v in data.get("namespace_allowlists", {}).items()
+            },
+        )
+
+    @staticmethod
+    @logger.logging_function(with_arg=True)
+    def from_json(text: str) -> FilterRules:
+        return FilterRules.from_dict(json.loads(text))
+
+
+def validate_tags(tags: Iterable[str]) -> FrozenSet[str]:
+    for x in tags:
+        namespace, _, value = x.partition(":")
+        if namespace.strip() == "" or value.strip() == "":
+            raise ValueError(f"tag rule {x!r} is not in namespace:value form")
+    return frozenset(tags)
+
+
+def compile_tags(tags: FrozenSet[str]) -> FrozenSet[int]:
+    return frozenset(pack_tag(*x.lower().split(":", 1)) for x in tags)
+
+
+class EntryFilter(object):
+    categories: FrozenSet[str]
+    include_tags: FrozenSet[int]
+    exclude_tags: FrozenSet[int]
+    namespace_allowlists: Dict[int, FrozenSet[int]]
+    namespace_allowed_values: Dict[int, FrozenSet[str]]
+
+    def __init__(self, rules: FilterRules):
+        self.categories = rules.categories
+        self.include_tags = compile_tags(rules.include_tags)
+        self.exclude_tags = compile_tags(rules.exclude_tags)
+        self.namespace_allowlists = {
+            vocabulary.intern(k): compile_tags(frozenset(f"{k}:{x}" for x in v))
+            for k, v in rules.namespace_allowlists.items()
+        }
+        self.namespace_allowed_values = {
+            vocabulary.intern(k): frozenset(x.lower() for x in v)
+            for k, v in rules.namespace_allowlists.items()
+        }
+
+    def _evaluate(self, entry: EntrySummary) -> bool:
+        if len(self.categories) > 0:
+            if _parse_category(entry.title) not in self.categories:
+                return False
+        tags = entry.tags
+        if tags.intersects(self.exclude_tags):
+            return False
+        if len(self.include_tags) > 0 and not tags.intersects(self.include_tags):
+            return False
+        for namespace_id, allowed in self.namespace_allowlists.items():
+            if tags.has_namespace_id(namespace_id) and not tags.intersects(allowed):
+                if not self._has_allowed_prefix(tags, namespace_id):
+                    return False
+        return True
+
+    def _has_allowed_prefix(self, tags: TagSet, namespace_id: int) -> bool:
+        allowed = self.namespace_allowed_values[namespace_id]
+        return any(
+            x in allowed
+            for value in tags.namespace_values(vocabulary.name(namespace_id))
+            for x in leading_values(value)
+        )
+
+    @logger.logging_function()
+    def matches(self, entry: EntrySummary) -> bool:
+        return self._evaluate(entry)
+
+    @logger.logging_function()
+    def filter(self, entries: Iterable[T]) -> List[T]:
+        return [x for x in entries if self._evaluate(x)]
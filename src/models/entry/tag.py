@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# A value is lowercase words; the first word that is not one (a URL,
+# capitalised or non-ASCII text) starts the free text after the last tag.
+TAG_WORD = r"[a-z0-9.'&+!-]+(?=\s|$)"
+TAG_PATTERN = re.compile(rf"([a-z]+):({TAG_WORD}(?:\s+{TAG_WORD})*)")
+VALUE_BITS = 32
+VALUE_MASK = (1 << VALUE_BITS) - 1
+MAX_CACHED_TAGS = 100000
+MAX_VOCABULARY = 200000
+
+
+class TagVocabulary(object):
+    _shared_state: dict = {}
+    ids: Dict[str, int] = {}
+    names: List[str] = []
+    tags: Dict[str, int] = {}
+    lock = Lock()
+
+    def __init__(self):
+        self.__dict__ = self._shared_state
+
+    def intern(self, name: str) -> int:
+        result = self.ids.get(name)
+        if result is not None:
+            return result
+        with self.lock:
+            result = self.ids.get(name)
+            if result is None:
+                result = len(self.names)
+                self.names.append(name)
+                self.ids[name] = result
+        return result
+
+    def reset_if_full(self, limit: int = MAX_VOCABULARY) -> bool:
+        # Live TagSets and compiled filters hold ids into this table, so only
+        # call this between invocations, before any summary is parsed.
+        if len(self.names) < limit:
+            return False
+        with self.lock:
+            self.ids.clear()
+            self.names.clear()
+            self.tags.clear()
+        return True
+
+    def find(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+    def name(self, id_: int) -> str:
+        return self.names[id_]
+
+
+vocabulary = TagVocabulary()
+
+
+def pack_tag(namespace: str, value: str) -> int:
+    return (vocabulary.intern(namespace) << VALUE_BITS) | vocabulary.intern(value)
+
+
+def unpack_tag(tag: int) -> Tuple[str, str]:
+    return vocabulary.name(tag >> VALUE_BITS), vocabulary.name(tag & VALUE_MASK)
+
+
+def leading_values(value: str) -> Iterator[str]:
+    # Lowercase free text after the last tag still joins its value, so the
+    # value's leading words are candidates for the tag itself, longest first.
+    words = value.split()
+    for i in range(len(words) - 1, 0, -1):
+        yield " ".join(words[:i])
+
+
+class TagSet(object):
+    __slots__ = ("values",)
+    values: array
+
+    def __init__(self, tags: Iterable[int] = ()):
+        self.values = array("Q", sorted(set(tags)))
+
+    @staticmethod
+    def parse(summary: Optional[str]) -> TagSet:
+        if summary is None:
+            return TagSet()
+        tags: List[int] = []
+        cache = vocabulary.tags
+        for x in summary.split(","):
+            piece = x.strip()
+            tag = cache.get(piece)
+            if tag is None:
+                match = TAG_PATTERN.match(piece)
+                if match is None:
+                    continue
+                tag = pack_tag(match.group(1), match.group(2))
+                if len(cache) < MAX_CACHED_TAGS:
+                    cache[piece] = tag
+            tags.append(tag)
+        return TagSet(tags)
+
+    def _contains(self, tag: int) -> bool:
+        index = bisect_left(self.values, tag)
+        return index < len(self.values) and self.values[index] == tag
+
+    def has(self, namespace: str, value: str) -> bool:
+        namespace_id = vocabulary.find(namespace)
+        value_id = vocabulary.find(value)
+        if namespace_id is None or value_id is None:
+            return False
+        return self._contains((namespace_id << VALUE_BITS) | value_id)
+
+    def has_namespace_id(self, namespace_id: int) -> bool:
+        index = bisect_left(self.values, namespace_id << VALUE_BITS)
+        return (
+            index < len(self.values)
+            and self.values[index] >> VALUE_BITS == namespace_id
+        )
+
+    def has_namespace(self, namespace: str) -> bool:
+        namespace_id = vocabulary.find(namespace)
+        return namespace_id is not None and self.has_namespace_id(namespace_id)
+
+    def namespace_values(self, namespace: str) -> List[str]:
+        namespace_id = vocabulary.find(namespace)
+        if namespace_id is None:
+            return []
+        start = bisect_left(self.values, namespace_id << VALUE_BITS)
+        end = bisect_left(self.values, (namespace_id + 1) << VALUE_BITS)
+        return [vocabulary.name(x & VALUE_MASK) for x in self.values[start:end]]
+
+    def intersects(self, tags: FrozenSet[int]) -> bool:
+        return not tags.isdisjoint(self.values)
+
+    def __iter__(self) -> Iterator[str]:
+        for x in self.values:
+            namespace, value = unpack_tag(x)
+            yield f"{namespace}:{value}"
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TagSet) and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash(self.values.tobytes())
+
+    def __repr__(self) -> str:
+        return f"TagSet({list(self)})"
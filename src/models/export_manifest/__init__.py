@@ -0,0 +1 @@
+from .export_manifest import ExportChunk, ExportManifest
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, List, Optional
+
+from botocore.exceptions import ClientError
+
+from logger import MyLogger
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3.service_resource import Bucket
+
+logger = MyLogger(__name__)
+
+KEY_PREFIX = "export/article"
+LATEST_KEY = f"{KEY_PREFIX}/latest.json"
+
+
+@dataclass()
+class ExportChunk:
+    key: str
+    segment: int
+    count: int
+
+
+@dataclass()
+class ExportManifest:
+    export_id: str
+    started_at_ms: int
+    since_ms: Optional[int] = field(default=None)
+    segments: int = field(default=1)
+    chunks: List[ExportChunk] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.chunks = [
+            x if isinstance(x, ExportChunk) else ExportChunk(**x) for x in self.chunks
+        ]
+
+    @staticmethod
+    def build_prefix(export_id: str) -> str:
+        return f"{KEY_PREFIX}/{export_id}"
+
+    @logger.logging_function()
+    def get_item_count(self) -> int:
+        return sum(x.count for x in self.chunks)
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True)
+    def load_latest(bucket: Bucket) -> Optional[ExportManifest]:
+        try:
+            resp = bucket.Object(LATEST_KEY).get()
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchKey":
+                raise
+            return None
+        return ExportManifest(**json.load(resp["Body"]))
+
+    @logger.logging_function(write_log=True)
+    def save(self, bucket: Bucket):
+        body = json.dumps(asdict(self)).encode()
+        bucket.put_object(
+            Key=f"{self.build_prefix(self.export_id)}/manifest.json",
+            Body=body,
+            ContentType="application/json",
+        )
+        # Written last so readers never see a manifest with missing chunks.
+        bucket.put_object(Key=LATEST_KEY, Body=body, ContentType="application/json")
@@ -0,0 +1 @@
+from .feed_state import FeedState
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from hashlib import sha1
+from typing import TYPE_CHECKING, Optional
+
+from botocore.exceptions import ClientError
+
+from logger import MyLogger
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3.service_resource import Bucket
+
+logger = MyLogger(__name__)
+
+KEY_PREFIX = "feed_state"
+
+
+@dataclass()
+class FeedState:
+    url: str
+    etag: Optional[str] = field(default=None)
+    modified: Optional[str] = field(default=None)
+    last_gid: Optional[int] = field(default=None)
+
+    @staticmethod
+    def build_key(url: str) -> str:
+        return f"{KEY_PREFIX}/{sha1(url.encode()).hexdigest()}.json"
+
+    @staticmethod
+    @logger.logging_function(write_log=True, with_return=True, with_arg=True)
+    def load(url: str, bucket: Bucket) -> FeedState:
+        try:
+            resp = bucket.Object(FeedState.build_key(url)).get()
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchKey":
+                raise
+            return FeedState(url=url)
+        return FeedState(**json.load(resp["Body"]))
+
+    @logger.logging_function(write_log=True)
+    def save(self, bucket: Bucket):
+        bucket.put_object(
+            Key=self.build_key(self.url),
+            Body=json.dumps(asdict(self)).encode(),
+            ContentType="application/json",
+        )
@@ -0,0 +1 @@
+from .seen_url import SeenUrlCache
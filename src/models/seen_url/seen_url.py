@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from logger import MyLogger
+from models.article import Article
+from utils.bloom import BloomFilter
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb.service_resource import Table
+    from mypy_boto3_s3.service_resource import Bucket
+
+logger = MyLogger(__name__)
+
+SNAPSHOT_KEY = "seen_url/bloom.bin"
+MAX_CONFIRMED = 10000
+BLOOM_CAPACITY = 1000000
+BLOOM_ERROR_RATE = 0.01
+
+
+class SeenUrlCache(object):
+    confirmed: OrderedDict[str, bool]
+    bloom: Optional[BloomFilter]
+    bucket: Optional[Bucket]
+    max_confirmed: int
+
+    def __init__(self, max_confirmed: int = MAX_CONFIRMED):
+        self.confirmed = OrderedDict()
+        self.bloom = None
+        self.bucket = None
+        self.max_confirmed = max_confirmed
+
+    @logger.logging_function(write_log=True)
+    def load(self, bucket: Bucket):
+        if self.bloom is not None:
+            return
+        self.bucket = bucket
+        try:
+            resp = bucket.Object(SNAPSHOT_KEY).get()
+            bloom = BloomFilter.from_bytes(resp["Body"].read())
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchKey":
+                raise
+            # Scanning the table is left to handlers/rebuild_seen_url; until it
+            # runs every url looks new and is inserted conditionally.
+            bloom = BloomFilter.for_capacity(BLOOM_CAPACITY, BLOOM_ERROR_RATE)
+        self.bloom = bloom
+
+    @logger.logging_function(write_log=True, with_arg=True)
+    def rebuild(self, table: Table, bucket: Bucket, capacity: int) -> BloomFilter:
+        bloom = BloomFilter.for_capacity(capacity, BLOOM_ERROR_RATE)
+        bloom.update(Article.scan_urls(table))
+        self.bloom = bloom
+        self.bucket = bucket
+        self.save()
+        return bloom
+
+    @logger.logging_function(write_log=True)
+    def save(self):
+        if self.bucket is None or self.bloom is None:
+            return
+        self.bucket.put_object(Key=SNAPSHOT_KEY, Body=self.bloom.to_bytes())
+
+    @logger.logging_function()
+    def classify(self, urls: Iterable[str]) -> Tuple[List[str], List[str], List[str]]:
+        seen: List[str] = []
+        possible: List[str] = []
+        new: List[str] = []
+        for x in urls:
+            if x in self.confirmed:
+                self.confirmed.move_to_end(x)
+                seen.append(x)
+            elif self.bloom is None or x in self.bloom:
+                possible.append(x)
+            else:
+                new.append(x)
+        return seen, possible, new
+
+    @logger.logging_function()
+    def add_possible(self, urls: Iterable[str]):
+        if self.bloom is not None:
+            self.bloom.update(urls)
+
+    @logger.logging_function()
+    def add_confirmed(self, urls: Iterable[str]):
+        for x in urls:
+            self.confirmed[x] = True
+            self.confirmed.move_to_end(x)
+            if self.bloom is not None:
+                self.bloom.add(x)
+        while len(self.confirmed) > self.max_confirmed:
+            self.confirmed.popitem(last=False)
@@ -0,0 +1,6 @@
+from .aws import (
+    get_dynamodb_client,
+    get_dynamodb_resource,
+    get_s3_resource,
+    get_session,
+)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from threading import Lock
+from typing import TYPE_CHECKING, Optional
+
+import boto3
+import botocore.session
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBClient, DynamoDBServiceResource
+    from mypy_boto3_s3 import S3ServiceResource
+
+# boto3.Session is not thread safe while it creates clients.
+client_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def get_session() -> boto3.Session:
+    return boto3.Session(botocore_session=botocore.session.get_session())
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_resource() -> DynamoDBServiceResource:
+    return get_session().resource("dynamodb")
+
+
+@lru_cache(maxsize=None)
+def get_s3_resource() -> S3ServiceResource:
+    return get_session().resource("s3")
+
+
+@lru_cache(maxsize=None)
+def get_dynamodb_client(
+    endpoint_url: Optional[str] = None, region_name: Optional[str] = None
+) -> DynamoDBClient:
+    with client_lock:
+        return get_session().client(
+            "dynamodb", endpoint_url=endpoint_url, region_name=region_name
+        )
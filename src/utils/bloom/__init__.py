@@ -0,0 +1 @@
+from .bloom import BloomFilter
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+import struct
+import zlib
+from hashlib import blake2b
+from typing import Iterable, Iterator
+
+HEADER = struct.Struct(">QII")
+
+
+class BloomFilter(object):
+    size: int
+    hash_count: int
+    count: int
+    bits: bytearray
+
+    def __init__(self, size: int, hash_count: int, count: int = 0, bits=None):
+        self.size = size
+        self.hash_count = hash_count
+        self.count = count
+        self.bits = bytearray((size + 7) // 8) if bits is None else bytearray(bits)
+
+    @staticmethod
+    def for_capacity(capacity: int, error_rate: float) -> BloomFilter:
+        size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return BloomFilter(size, hash_count)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        is_new = False
+        for x in self._positions(key):
+            mask = 1 << (x & 7)
+            if not self.bits[x >> 3] & mask:
+                self.bits[x >> 3] |= mask
+                is_new = True
+        if is_new:
+            self.count += 1
+
+    def update(self, keys: Iterable[str]):
+        for x in keys:
+            self.add(x)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[x >> 3] & (1 << (x & 7)) for x in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(self.count, self.size, self.hash_count)
+        return header + zlib.compress(bytes(self.bits))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> BloomFilter:
+        count, size, hash_count = HEADER.unpack_from(data)
+        bits = zlib.decompress(data[HEADER.size :])
+        return BloomFilter(size, hash_count, count, bits)
@@ -1 +1 @@
-from .datetime import JST, now
+from .datetime import JST, now, parse_epoch_ms, to_epoch_ms
@@ -5,3 +5,13 @@ JST = timezone(offset=timedelta(hours=+9), name="JST")
 
 def now() -> datetime:
     return datetime.now(JST)
+
+
+def to_epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=JST)
+    return int(value.timestamp() * 1000)
+
+
+def parse_epoch_ms(text: str) -> int:
+    return to_epoch_ms(datetime.fromisoformat(text))
@@ -0,0 +1 @@
+from .stream import iter_rss_items
@@ -0,0 +1,37 @@
+from typing import BinaryIO, Dict, Iterator, List
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from logger import MyLogger
+
+logger = MyLogger(__name__)
+
+CHUNK_SIZE = 16 * 1024
+ITEM_FIELDS = {"link": "link", "title": "title", "description": "summary"}
+
+
+@logger.logging_function()
+def iter_rss_items(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Dict[str, str]]:
+    parser = XMLPullParser(events=("start", "end"))
+    parents: List[Element] = []
+    while True:
+        chunk = stream.read(chunk_size)
+        if len(chunk) == 0:
+            break
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag != "item":
+                continue
+            item: Dict[str, str] = {}
+            for x in elem:
+                if x.tag in ITEM_FIELDS:
+                    item[ITEM_FIELDS[x.tag]] = "".join(x.itertext())
+            yield item
+            if len(parents) > 0:
+                parents[-1].remove(elem)
+    parser.close()
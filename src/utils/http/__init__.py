@@ -1,3 +1,3 @@
-from .http import generate_get_http_client, http_get
+from .http import generate_get_http_client, generate_host_limiter, http_get, http_open
 
 sec5_client = generate_get_http_client(5)
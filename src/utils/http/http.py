@@ -1,25 +1,45 @@
 from datetime import datetime
+from http.client import HTTPResponse
+from threading import BoundedSemaphore, Lock
 from time import sleep
-from typing import AnyStr, Callable, Optional
+from typing import AnyStr, Callable, Dict, Optional
+from urllib.error import HTTPError
+from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
 from logger import MyLogger
 
 logger = MyLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"
+
 
 @logger.logging_function(with_arg=True, write_log=True)
 def http_get(url: str) -> AnyStr:
     req = Request(
         url=url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 Safari/537.36"
-        },
+        headers={"User-Agent": USER_AGENT},
     )
     resp = urlopen(req)
     return resp.read()
 
 
+@logger.logging_function(with_arg=True, write_log=True)
+def http_open(
+    url: str, headers: Optional[Dict[str, str]] = None
+) -> Optional[HTTPResponse]:
+    req = Request(
+        url=url,
+        headers={"User-Agent": USER_AGENT, **(headers or {})},
+    )
+    try:
+        return urlopen(req)
+    except HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
 def generate_get_http_client(sec_interval: int) -> Callable[[str], AnyStr]:
     dt_prev: Optional[datetime] = None
 
@@ -37,3 +57,17 @@ def generate_get_http_client(sec_interval: int) -> Callable[[str], AnyStr]:
         return result
 
     return process
+
+
+def generate_host_limiter(max_per_host: int) -> Callable[[str], BoundedSemaphore]:
+    semaphores: Dict[str, BoundedSemaphore] = {}
+    lock = Lock()
+
+    def process(url: str) -> BoundedSemaphore:
+        host = urlparse(url).netloc
+        with lock:
+            if host not in semaphores:
+                semaphores[host] = BoundedSemaphore(max_per_host)
+            return semaphores[host]
+
+    return process
@@ -0,0 +1 @@
+from .retry import sleep_with_backoff
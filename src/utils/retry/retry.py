@@ -0,0 +1,6 @@
+from random import uniform
+from time import sleep
+
+
+def sleep_with_backoff(attempt: int, base: float = 0.05, cap: float = 2.0):
+    sleep(uniform(0, min(cap, base * 2**attempt)))
@@ -0,0 +1 @@
+from .slots import add_slots
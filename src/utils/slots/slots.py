@@ -0,0 +1,23 @@
+from dataclasses import fields
+from typing import Any, Callable, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+def add_slots(extra: Tuple[str, ...] = ()) -> Callable[[Type[T]], Type[T]]:
+    # Backport of dataclass(slots=True) for Python 3.9: rebuild the class with
+    # __slots__ for its fields. Defaults stay bound in the generated __init__.
+    def wrapper(cls: Type[T]) -> Type[T]:
+        cls_dict = dict(cls.__dict__)
+        names = tuple(x.name for x in fields(cls)) + extra
+        cls_dict["__slots__"] = names
+        for name in names:
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        metaclass: Any = type(cls)
+        result: Type[T] = metaclass(cls.__name__, cls.__bases__, cls_dict)
+        result.__qualname__ = cls.__qualname__
+        return result
+
+    return wrapper
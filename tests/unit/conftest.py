@@ -1,10 +1,11 @@
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import boto3
 import pytest
 from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_s3 import S3ServiceResource
 from pytest import MonkeyPatch
 
 
@@ -37,6 +38,31 @@ def dynamodb(
         dynamodb_resource.Table(name_table).delete()
 
 
+@pytest.fixture(scope="session")
+def s3_resource() -> S3ServiceResource:
+    return boto3.resource("s3", endpoint_url="http://localhost:4566")
+
+
+@pytest.fixture(scope="function")
+def s3(request, s3_resource: S3ServiceResource) -> S3ServiceResource:
+    param: List[str] = request.param
+
+    for name_bucket in param:
+        s3_resource.create_bucket(
+            Bucket=name_bucket,
+            CreateBucketConfiguration={
+                "LocationConstraint": s3_resource.meta.client.meta.region_name
+            },
+        )
+
+    yield s3_resource
+
+    for name_bucket in param:
+        bucket = s3_resource.Bucket(name_bucket)
+        bucket.objects.all().delete()
+        bucket.delete()
+
+
 @pytest.fixture(scope="function")
 def set_environ(request, monkeypatch: MonkeyPatch):
     param: Dict[str, str] = request.param
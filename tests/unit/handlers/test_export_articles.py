@@ -0,0 +1,159 @@
+import gzip
+import json
+from typing import List
+
+import pytest
+from freezegun import freeze_time
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_s3 import S3ServiceResource
+from pytest import MonkeyPatch
+
+import handlers.export_articles as index
+from models.article import Article
+from models.export_manifest import ExportManifest
+
+
+def read_chunks(s3: S3ServiceResource, manifest: ExportManifest) -> List[Article]:
+    bucket = s3.Bucket("data")
+    articles = []
+    for chunk in manifest.chunks:
+        body = bucket.Object(chunk.key).get()["Body"].read()
+        lines = gzip.decompress(body).decode().splitlines()
+        assert len(lines) == chunk.count
+        articles += [Article(**json.loads(x)) for x in lines]
+    return articles
+
+
+class TestLoadEnvironment:
+    @pytest.mark.parametrize(
+        "set_environ, expected",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                index.EnvironmentVariables(
+                    dynamodb_table_name="article", data_bucket_name="data"
+                ),
+            ),
+            (
+                {
+                    "DYNAMODB_TABLE_NAME": "article",
+                    "DATA_BUCKET_NAME": "data",
+                    "EXPORT_SEGMENTS": "2",
+                    "EXPORT_CHUNK_SIZE": "1",
+                },
+                index.EnvironmentVariables(
+                    dynamodb_table_name="article",
+                    data_bucket_name="data",
+                    export_segments="2",
+                    export_chunk_size="1",
+                ),
+            ),
+        ],
+        indirect=["set_environ"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_normal(self, expected):
+        actual = index.load_environment()
+        assert actual == expected
+
+
+class TestMain:
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                {"article": "複数データ1"},
+                ["data"],
+            ),
+            (
+                {
+                    "DYNAMODB_TABLE_NAME": "article",
+                    "DATA_BUCKET_NAME": "data",
+                    "EXPORT_SEGMENTS": "3",
+                    "EXPORT_CHUNK_SIZE": "1",
+                },
+                {"article": "複数データ1"},
+                ["data"],
+            ),
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    @freeze_time("2022-10-01 00:00:00.000000+09:00")
+    def test_normal_full(
+        self, dynamodb: DynamoDBServiceResource, s3: S3ServiceResource
+    ):
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        expected = [Article(**x) for x in dynamodb.Table("article").scan()["Items"]]
+        assert actual.since_ms is None
+        assert actual.get_item_count() == len(expected)
+        assert set(read_chunks(s3, actual)) == set(expected)
+        assert ExportManifest.load_latest(s3.Bucket("data")) == actual
+
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3, started_at_ms, expected",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                {"article": "複数データ1"},
+                ["data"],
+                1663580374536,
+                ["xyyzzz"],
+            ),
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                {"article": "複数データ1"},
+                ["data"],
+                1663580374536 + index.INCREMENTAL_OVERLAP_MS + 1,
+                [],
+            ),
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    @freeze_time("2022-10-01 00:00:00.000000+09:00")
+    def test_normal_incremental(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+        started_at_ms: int,
+        expected: List[str],
+    ):
+        previous = ExportManifest(
+            export_id=str(started_at_ms), started_at_ms=started_at_ms
+        )
+        previous.save(s3.Bucket("data"))
+
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        assert actual.since_ms == started_at_ms - index.INCREMENTAL_OVERLAP_MS
+        assert [x.url for x in read_chunks(s3, actual)] == expected
+
+        full = index.main(dynamodb_resource=dynamodb, s3_resource=s3, full=True)
+        assert full.since_ms is None
+        assert full.get_item_count() == 3
+
+
+class TestExportTable:
+    @pytest.mark.parametrize(
+        "dynamodb, s3", [({"article": "複数データ1"}, ["data"])], indirect=True
+    )
+    def test_normal(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+    ):
+        table = dynamodb.Table("article")
+        bucket = s3.Bucket("data")
+        expected = [Article(**x) for x in table.scan()["Items"]]
+        # Segment workers must not share the resources across threads.
+        monkeypatch.setattr(table, "scan", lambda **_: pytest.fail())
+        monkeypatch.setattr(bucket, "put_object", lambda **_: pytest.fail())
+
+        chunks = index.export_table(table, bucket, "exports/test", 2, 1)
+
+        manifest = ExportManifest(export_id="test", started_at_ms=0, chunks=chunks)
+        assert set(read_chunks(s3, manifest)) == set(expected)
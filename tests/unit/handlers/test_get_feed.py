@@ -1,15 +1,18 @@
 from dataclasses import dataclass
-from typing import List
+from io import BytesIO
+from typing import Dict, List, Optional, Set
 
 import feedparser
 import pytest
 from botocore.exceptions import ClientError
 from freezegun import freeze_time
 from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_s3 import S3ServiceResource
 from pytest import MonkeyPatch
 
 import handlers.get_feed as index
 from models.article import Article, StateArticle
+from utils.bloom import BloomFilter
 
 
 @dataclass(frozen=True)
@@ -22,9 +25,23 @@ class TestLoadEnvironment:
         "set_environ, expected",
         [
             (
-                {"DYNAMODB_TABLE_NAME": "sinofseven"},
-                index.EnvironmentVariables(dynamodb_table_name="sinofseven"),
-            )
+                {"DYNAMODB_TABLE_NAME": "sinofseven", "DATA_BUCKET_NAME": "data"},
+                index.EnvironmentVariables(
+                    dynamodb_table_name="sinofseven", data_bucket_name="data"
+                ),
+            ),
+            (
+                {
+                    "DYNAMODB_TABLE_NAME": "sinofseven",
+                    "DATA_BUCKET_NAME": "data",
+                    "FEED_PARSER_MODE": "stream",
+                },
+                index.EnvironmentVariables(
+                    dynamodb_table_name="sinofseven",
+                    data_bucket_name="data",
+                    feed_parser_mode=index.FeedParserMode.Stream,
+                ),
+            ),
         ],
         indirect=["set_environ"],
     )
@@ -34,6 +51,151 @@ class TestLoadEnvironment:
         assert actual == expected
 
 
+class TestFetchFeed:
+    @pytest.mark.parametrize(
+        "state, feed, expected, expected_state",
+        [
+            (
+                index.FeedState(url=index.FEED_URL),
+                {
+                    "status": 200,
+                    "etag": '"abc"',
+                    "modified": "Sat, 01 Oct 2022 00:00:00 GMT",
+                    "entries": [],
+                },
+                {
+                    "status": 200,
+                    "etag": '"abc"',
+                    "modified": "Sat, 01 Oct 2022 00:00:00 GMT",
+                    "entries": [],
+                },
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+            ),
+            (
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+                {"status": 304, "entries": []},
+                None,
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+            ),
+        ],
+    )
+    def test_normal(
+        self,
+        monkeypatch: MonkeyPatch,
+        state: index.FeedState,
+        feed: dict,
+        expected: Optional[dict],
+        expected_state: index.FeedState,
+    ):
+        calls: List[dict] = []
+
+        def dummy(url: str, **kwargs) -> dict:
+            calls.append({"url": url, **kwargs})
+            return feed
+
+        sent = {"url": state.url, "etag": state.etag, "modified": state.modified}
+        monkeypatch.setattr(feedparser, "parse", dummy)
+        actual = index.fetch_feed(state)
+        assert actual == expected
+        assert state == expected_state
+        assert calls == [sent]
+
+
+class DummyStreamResponse(BytesIO):
+    headers: Dict[str, str]
+
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        super().__init__(body)
+        self.headers = headers
+
+
+class TestFetchFeedStream:
+    @pytest.mark.parametrize(
+        "state, response, expected_entries, expected_state, expected_headers",
+        [
+            (
+                index.FeedState(url=index.FEED_URL, etag='"abc"'),
+                DummyStreamResponse(
+                    b"<rss><channel><item><title>[Manga] test</title>"
+                    b"<link>https://e-hentai.org/g/2330808/37cfac63e0/</link>"
+                    b"<description>female:yuri</description></item></channel></rss>",
+                    {
+                        "ETag": '"def"',
+                        "Last-Modified": "Sat, 01 Oct 2022 00:00:00 GMT",
+                    },
+                ),
+                [
+                    {
+                        "title": "[Manga] test",
+                        "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                        "summary": "female:yuri",
+                    }
+                ],
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"def"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+                {"If-None-Match": '"abc"'},
+            ),
+            (
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+                None,
+                None,
+                index.FeedState(
+                    url=index.FEED_URL,
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                ),
+                {
+                    "If-None-Match": '"abc"',
+                    "If-Modified-Since": "Sat, 01 Oct 2022 00:00:00 GMT",
+                },
+            ),
+        ],
+    )
+    def test_normal(
+        self,
+        monkeypatch: MonkeyPatch,
+        state: index.FeedState,
+        response: Optional[DummyStreamResponse],
+        expected_entries: Optional[List[dict]],
+        expected_state: index.FeedState,
+        expected_headers: Dict[str, str],
+    ):
+        calls: List[Dict[str, str]] = []
+
+        def dummy(url: str, headers: Dict[str, str]):
+            calls.append(headers)
+            return response
+
+        monkeypatch.setattr("handlers.get_feed.http_open", dummy)
+        actual = index.fetch_feed(state, index.FeedParserMode.Stream)
+        if expected_entries is None:
+            assert actual is None
+        else:
+            assert actual is not None
+            assert list(actual["entries"]) == expected_entries
+        assert state == expected_state
+        assert calls == [expected_headers]
+
+
 class TestGetFeedEntries:
     @pytest.mark.parametrize(
         "feed, expected",
@@ -118,12 +280,147 @@ class TestGetFeedEntries:
             )
         ],
     )
+    def test_normal(self, feed: dict, expected: List[index.EntrySummary]):
+        actual = index.get_feed_entries(feed)
+        assert set(actual) == set(expected)
+
+    @pytest.mark.parametrize(
+        "feed, watermark, expected",
+        [
+            (
+                {
+                    "entries": [
+                        {
+                            "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                            "title": "[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi, Onii-chan",
+                            "summary": "parody:original, group:ins-mode",
+                        },
+                        {
+                            "link": "https://e-hentai.org/g/2330807/7e1d0dea77/",
+                            "title": "[Manga] [Jの覚醒とWの本能]エッチな体験談告白投稿男塾より！[中国翻译]",
+                            "summary": "language:chinese, language:translated",
+                        },
+                        {
+                            "link": "https://e-hentai.org/g/2330806/ce58d95bd2/",
+                            "title": "[Artist CG] beautiful",
+                            "summary": "other:forbidden content",
+                        },
+                    ]
+                },
+                2330807,
+                [
+                    index.EntrySummary(
+                        link="https://e-hentai.org/g/2330808/37cfac63e0/",
+                        title="[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi, Onii-chan",
+                        summary="parody:original, group:ins-mode",
+                    ),
+                ],
+            ),
+            (
+                {
+                    "entries": [
+                        {
+                            "link": "https://e-hentai.org/g/2330806/ce58d95bd2/",
+                            "title": "[Artist CG] beautiful",
+                            "summary": "other:forbidden content",
+                        },
+                    ]
+                },
+                2330808,
+                [],
+            ),
+        ],
+    )
+    def test_normal_with_watermark(
+        self, feed: dict, watermark: int, expected: List[index.EntrySummary]
+    ):
+        actual = index.get_feed_entries(feed, watermark)
+        assert list(actual) == expected
+
+
+class TestLoadFilterRules:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("", index.DEFAULT_FILTER_RULES),
+            (
+                '{"categories": ["Manga"]}',
+                index.FilterRules(categories=frozenset(["Manga"])),
+            ),
+        ],
+    )
+    def test_normal(self, text: str, expected: index.FilterRules):
+        actual = index.load_filter_rules(text)
+        assert actual == expected
+
+
+class TestParseFeedUrls:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            (
+                "https://xml.e-hentai.org/ehg.xml",
+                ["https://xml.e-hentai.org/ehg.xml"],
+            ),
+            (
+                " https://a.example/rss , https://b.example/rss,,https://a.example/rss",
+                ["https://a.example/rss", "https://b.example/rss"],
+            ),
+        ],
+    )
+    def test_normal(self, text: str, expected: List[str]):
+        actual = index.parse_feed_urls(text)
+        assert actual == expected
+
+
+class TestMergeEntries:
+    @pytest.mark.parametrize(
+        "results, expected",
+        [
+            (
+                [
+                    index.FeedResult(
+                        state=index.FeedState(url="https://a.example/rss"),
+                        entries=[
+                            index.EntrySummary(link="1", title="a", summary=""),
+                            index.EntrySummary(link="2", title="b", summary=""),
+                        ],
+                    ),
+                    index.FeedResult(
+                        state=index.FeedState(url="https://b.example/rss"),
+                        entries=[
+                            index.EntrySummary(link="2", title="b", summary=""),
+                            index.EntrySummary(link="3", title="c", summary=""),
+                        ],
+                    ),
+                ],
+                [
+                    index.EntrySummary(link="1", title="a", summary=""),
+                    index.EntrySummary(link="2", title="b", summary=""),
+                    index.EntrySummary(link="3", title="c", summary=""),
+                ],
+            )
+        ],
+    )
     def test_normal(
-        self, monkeypatch: MonkeyPatch, feed: dict, expected: List[index.EntrySummary]
+        self, results: List[index.FeedResult], expected: List[index.EntrySummary]
     ):
-        monkeypatch.setattr(feedparser, "parse", lambda _: feed)
-        actual = index.get_feed_entries()
-        assert set(actual) == set(expected)
+        actual = index.merge_entries(results)
+        assert list(actual) == expected
+
+
+class TestParseGid:
+    @pytest.mark.parametrize(
+        "url, expected",
+        [
+            ("https://e-hentai.org/g/2330808/37cfac63e0/", 2330808),
+            ("https://e-hentai.org/g/2330745/b3d0811bea/", 2330745),
+            ("https://e-hentai.org/", None),
+        ],
+    )
+    def test_normal(self, url: str, expected: Optional[int]):
+        actual = index.parse_gid(url)
+        assert actual == expected
 
 
 class TestIsTargetCategory:
@@ -269,19 +566,140 @@ class TestInsertArticle:
             )
 
         table = dynamodb.Table("article")
-        monkeypatch.setattr(table, "put_item", dummy)
+        monkeypatch.setattr(table.meta.client, "put_item", dummy)
 
         with pytest.raises(ClientError):
             index.insert_article(url, table)
 
 
+class TestInsertArticles:
+    @pytest.mark.parametrize(
+        "dynamodb, urls, expected, expected_summary",
+        [
+            (
+                {"article": "上書きテスト1"},
+                ["1223334444", "abbcccdddd", "abbcccdddd"],
+                [
+                    Article(
+                        url="1223334444",
+                        status=StateArticle.Inserted,
+                        created_at="2022-01-09 16:17:22.123456+09:00",
+                        updated_at="2022-01-09 16:17:22.123456+09:00",
+                    ),
+                    Article(
+                        url="abbcccdddd",
+                        status=StateArticle.Inserted,
+                        created_at="2022-02-22 11:11:11.123456+09:00",
+                        updated_at="2022-02-22 11:11:11.123456+09:00",
+                        version=1,
+                    ),
+                ],
+                index.InsertSummary(attempted=2, written=1, skipped=1),
+            ),
+            (
+                {"article": None},
+                [],
+                [],
+                index.InsertSummary(attempted=0, written=0, skipped=0),
+            ),
+        ],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-02-22 11:11:11.123456+09:00")
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        urls: List[str],
+        expected: List[Article],
+        expected_summary: index.InsertSummary,
+    ):
+        table = dynamodb.Table("article")
+
+        actual = index.insert_articles(urls, table)
+
+        resp = table.scan()
+        assert set([Article(**x) for x in resp.get("Items", [])]) == set(expected)
+        assert actual == expected_summary
+
+
+class TestInsertArticlesWithCache:
+    @pytest.mark.parametrize(
+        "dynamodb, urls, confirmed, bloom_keys, expected_lookup, expected_summary",
+        [
+            (
+                {"article": "上書きテスト1"},
+                ["cached", "1223334444", "abbcccdddd"],
+                ["cached"],
+                ["1223334444"],
+                ["1223334444"],
+                index.InsertSummary(attempted=3, written=1, skipped=2),
+            ),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        urls: List[str],
+        confirmed: List[str],
+        bloom_keys: List[str],
+        expected_lookup: List[str],
+        expected_summary: index.InsertSummary,
+    ):
+        cache = index.SeenUrlCache()
+        cache.bloom = BloomFilter.for_capacity(100, 0.01)
+        cache.bloom.update(bloom_keys)
+        cache.add_confirmed(confirmed)
+        lookups: List[List[str]] = []
+        original = Article.get_existing_urls
+
+        def dummy(targets: List[str], table):
+            lookups.append(targets)
+            return original(targets, table)
+
+        monkeypatch.setattr(Article, "get_existing_urls", dummy)
+        table = dynamodb.Table("article")
+
+        actual = index.insert_articles(urls, table, cache)
+
+        assert actual == expected_summary
+        assert lookups == [expected_lookup]
+        items = table.scan().get("Items", [])
+        assert set(x["url"] for x in items) == {"1223334444", "abbcccdddd"}
+        assert cache.classify(urls)[0] == urls
+
+
+class TestInsertArticlesWithStaleCache:
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_normal(self, dynamodb: DynamoDBServiceResource, url: str):
+        table = dynamodb.Table("article")
+        expected = Article.get_item(url, table)
+        cache = index.SeenUrlCache()
+        cache.bloom = BloomFilter.for_capacity(100, 0.01)
+
+        actual = index.insert_articles([url], table, cache)
+
+        assert actual == index.InsertSummary(attempted=1, written=0, skipped=1)
+        assert Article.get_item(url, table) == expected
+
+
 class TestMain:
+    @pytest.fixture(autouse=True)
+    def reset_seen_urls(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(index, "seen_urls", index.SeenUrlCache())
+
     @pytest.mark.parametrize(
-        "set_environ, dynamodb, feed_entries, expected",
+        "set_environ, dynamodb, s3, feed_entries, expected",
         [
             (
-                {"DYNAMODB_TABLE_NAME": "article"},
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
                 {"article": None},
+                ["data"],
                 {
                     "entries": [
                         {
@@ -327,30 +745,180 @@ class TestMain:
                         status=StateArticle.Inserted,
                         created_at="2022-02-01 11:11:11.123456+09:00",
                         updated_at="2022-02-01 11:11:11.123456+09:00",
+                        version=1,
                     ),
                     Article(
                         url="https://e-hentai.org/g/2330806/ce58d95bd2/",
                         status=StateArticle.Inserted,
                         created_at="2022-02-01 11:11:11.123456+09:00",
                         updated_at="2022-02-01 11:11:11.123456+09:00",
+                        version=1,
                     ),
                     Article(
                         url="https://e-hentai.org/g/2330758/efd417415c/",
                         status=StateArticle.Inserted,
                         created_at="2022-02-01 11:11:11.123456+09:00",
                         updated_at="2022-02-01 11:11:11.123456+09:00",
+                        version=1,
                     ),
                 ],
             )
         ],
-        indirect=["set_environ", "dynamodb"],
+        indirect=["set_environ", "dynamodb", "s3"],
     )
     @pytest.mark.usefixtures("set_environ")
     @freeze_time("2022-02-01 11:11:11.123456+09:00")
-    def test_normal(self, monkeypatch, dynamodb, feed_entries, expected):
-        monkeypatch.setattr(feedparser, "parse", lambda _: feed_entries)
-        index.main(dynamodb_resource=dynamodb)
+    def test_normal(self, monkeypatch, dynamodb, s3, feed_entries, expected):
+        monkeypatch.setattr(feedparser, "parse", lambda *args, **kwargs: feed_entries)
+        index.main(dynamodb_resource=dynamodb, s3_resource=s3)
 
         table = dynamodb.Table("article")
         resp = table.scan()
         assert set([Article(**x) for x in resp.get("Items", [])]) == set(expected)
+
+        state = index.FeedState.load(index.FEED_URL, s3.Bucket("data"))
+        assert state.last_gid == 2330808
+
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3, feeds, expected",
+        [
+            (
+                {
+                    "DYNAMODB_TABLE_NAME": "article",
+                    "DATA_BUCKET_NAME": "data",
+                    "FEED_URLS": "https://a.example/rss,https://b.example/rss",
+                },
+                {"article": None},
+                ["data"],
+                {
+                    "https://a.example/rss": {
+                        "entries": [
+                            {
+                                "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                                "title": "[Doujinshi] Oyasumi, Onii-chan",
+                                "summary": "parody:original",
+                            },
+                            {
+                                "link": "https://e-hentai.org/g/2330806/ce58d95bd2/",
+                                "title": "[Artist CG] beautiful",
+                                "summary": "other:forbidden content",
+                            },
+                        ]
+                    },
+                    "https://b.example/rss": {
+                        "entries": [
+                            {
+                                "link": "https://e-hentai.org/g/2330810/aaaaaaaaaa/",
+                                "title": "[Manga] new",
+                                "summary": "female:yuri",
+                            },
+                            {
+                                "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                                "title": "[Doujinshi] Oyasumi, Onii-chan",
+                                "summary": "parody:original",
+                            },
+                        ]
+                    },
+                },
+                {
+                    "https://e-hentai.org/g/2330808/37cfac63e0/",
+                    "https://e-hentai.org/g/2330806/ce58d95bd2/",
+                    "https://e-hentai.org/g/2330810/aaaaaaaaaa/",
+                },
+            )
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_normal_multi_feeds(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+        feeds: Dict[str, dict],
+        expected: Set[str],
+    ):
+        monkeypatch.setattr(feedparser, "parse", lambda url, **kwargs: feeds[url])
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        items = dynamodb.Table("article").scan().get("Items", [])
+        assert set([x["url"] for x in items]) == expected
+        assert actual == index.InsertSummary(attempted=3, written=3, skipped=0)
+
+        bucket = s3.Bucket("data")
+        assert index.FeedState.load("https://a.example/rss", bucket).last_gid == 2330808
+        assert index.FeedState.load("https://b.example/rss", bucket).last_gid == 2330810
+
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3",
+        [
+            (
+                {
+                    "DYNAMODB_TABLE_NAME": "article",
+                    "DATA_BUCKET_NAME": "data",
+                    "FEED_URLS": "https://a.example/rss,https://b.example/rss",
+                },
+                {"article": None},
+                ["data"],
+            )
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_exception_one_feed(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+    ):
+        def parse(url: str, **kwargs) -> dict:
+            if url == "https://b.example/rss":
+                raise ConnectionError("connection reset")
+            return {
+                "entries": [
+                    {
+                        "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                        "title": "[Doujinshi] Oyasumi, Onii-chan",
+                        "summary": "parody:original",
+                    }
+                ]
+            }
+
+        monkeypatch.setattr(feedparser, "parse", parse)
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        items = dynamodb.Table("article").scan().get("Items", [])
+        assert [x["url"] for x in items] == [
+            "https://e-hentai.org/g/2330808/37cfac63e0/"
+        ]
+        assert actual == index.InsertSummary(attempted=1, written=1, skipped=0)
+
+        bucket = s3.Bucket("data")
+        assert index.FeedState.load("https://a.example/rss", bucket).last_gid == 2330808
+        assert index.FeedState.load("https://b.example/rss", bucket).last_gid is None
+
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                {"article": None},
+                ["data"],
+            )
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_normal_not_modified(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+    ):
+        monkeypatch.setattr(
+            feedparser, "parse", lambda *args, **kwargs: {"status": 304}
+        )
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        assert actual is None
+        assert dynamodb.Table("article").scan().get("Items", []) == []
@@ -0,0 +1,54 @@
+import pytest
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_s3 import S3ServiceResource
+
+import handlers.rebuild_seen_url as index
+from models.seen_url.seen_url import SNAPSHOT_KEY
+from utils.bloom import BloomFilter
+
+
+class TestLoadEnvironment:
+    @pytest.mark.parametrize(
+        "set_environ, expected",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                index.EnvironmentVariables(
+                    dynamodb_table_name="article", data_bucket_name="data"
+                ),
+            ),
+        ],
+        indirect=["set_environ"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_normal(self, expected):
+        actual = index.load_environment()
+        assert actual == expected
+
+
+class TestMain:
+    @pytest.mark.parametrize(
+        "set_environ, dynamodb, s3, expected",
+        [
+            (
+                {"DYNAMODB_TABLE_NAME": "article", "DATA_BUCKET_NAME": "data"},
+                {"article": "複数データ1"},
+                ["data"],
+                ["1223334444", "abbcccdddd", "xyyzzz"],
+            )
+        ],
+        indirect=["set_environ", "dynamodb", "s3"],
+    )
+    @pytest.mark.usefixtures("set_environ")
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+        expected,
+    ):
+        actual = index.main(dynamodb_resource=dynamodb, s3_resource=s3)
+
+        assert actual == len(expected)
+        body = s3.Object("data", SNAPSHOT_KEY).get()["Body"].read()
+        bloom = BloomFilter.from_bytes(body)
+        assert all(x in bloom for x in expected)
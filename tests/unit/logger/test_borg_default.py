@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from pytest import MonkeyPatch
+
+from logger import MyLogger
+from logger.borg_default import BorgDefaultFunctions
+
+logger = MyLogger(__name__)
+
+
+@dataclass()
+class Point:
+    x: int
+    y: Decimal
+
+
+class Base(object):
+    def __init__(self, value: int):
+        self.value = value
+
+    def __str__(self) -> str:
+        return f"base {self.value}"
+
+
+class Derived(Base):
+    pass
+
+
+class Unknown(object):
+    def __str__(self) -> str:
+        return "unknown"
+
+
+@pytest.fixture(scope="function")
+def borg_default(monkeypatch: MonkeyPatch) -> BorgDefaultFunctions:
+    monkeypatch.setattr(
+        BorgDefaultFunctions, "registry", dict(BorgDefaultFunctions.registry)
+    )
+    monkeypatch.setattr(BorgDefaultFunctions, "dispatch_cache", {})
+    monkeypatch.setattr(BorgDefaultFunctions, "functions", [])
+    return BorgDefaultFunctions()
+
+
+class TestBorgDefaultFunctionsDefault:
+    @pytest.mark.parametrize(
+        "obj, expected",
+        [
+            (Decimal("3"), 3),
+            (Decimal("1.5"), 1.5),
+            (b"text", "text"),
+            (b"\xff\x00", "/wA="),
+            (Attr("url"), "url"),
+            (
+                Attr("url").eq("a"),
+                {
+                    "format": "{0} {operator} {1}",
+                    "operator": "=",
+                    "values": (Attr("url"), "a"),
+                },
+            ),
+            (Point(1, Decimal("2")), {"x": 1, "y": Decimal("2")}),
+            (Unknown(), {"type": str(Unknown), "value": "unknown"}),
+        ],
+    )
+    def test_normal(self, borg_default: BorgDefaultFunctions, obj: Any, expected: Any):
+        assert borg_default.default(obj) == expected
+        assert borg_default.default(obj) == expected
+
+    @pytest.mark.parametrize(
+        "cls, obj, expected",
+        [
+            (Base, Base(1), 1),
+            (Base, Derived(2), 2),
+            (Derived, Derived(3), 3),
+            (Derived, Base(4), {"type": str(Base), "value": "base 4"}),
+        ],
+    )
+    def test_normal_register(
+        self, borg_default: BorgDefaultFunctions, cls: type, obj: Any, expected: Any
+    ):
+        # Resolve once first so registering has to drop the cached lookup.
+        borg_default.default(obj)
+        logger.register_default_function(cls, lambda x: x.value)
+        assert borg_default.default(obj) == expected
+
+    def test_normal_register_overrides_base(self, borg_default: BorgDefaultFunctions):
+        class Money(Decimal):
+            pass
+
+        logger.register_default_function(Money, str)
+        assert borg_default.default(Money("1.50")) == "1.50"
+        assert borg_default.default(Decimal("1.50")) == 1.5
+
+    def test_normal_legacy_function(self, borg_default: BorgDefaultFunctions):
+        logger.add_default_function(
+            lambda x: (True, x.value) if isinstance(x, Base) else (False, None)
+        )
+        assert borg_default.default(Derived(1)) == 1
+        assert borg_default.default(Decimal("2")) == 2
+        assert borg_default.default(Unknown()) == {
+            "type": str(Unknown),
+            "value": "unknown",
+        }
@@ -0,0 +1,28 @@
+import logging.config
+
+import pytest
+from pytest import MonkeyPatch
+
+import logger.config as config
+from logger import MyLogger, configure_logging
+
+
+class TestConfigureLogging:
+    @pytest.mark.parametrize("count", [1, 3])
+    def test_normal(self, monkeypatch: MonkeyPatch, count: int):
+        calls = []
+        dict_config = logging.config.dictConfig
+
+        def counting_dict_config(value: dict):
+            calls.append(value)
+            dict_config(value)
+
+        monkeypatch.setattr(logging.config, "dictConfig", counting_dict_config)
+        monkeypatch.setattr(config, "is_configured", False)
+        for _ in range(count):
+            configure_logging()
+            MyLogger(__name__)
+
+        assert len(calls) == 1
+        assert calls[0]["root"]["level"] == "DEBUG"
+        assert logging.getLogger().handlers != []
@@ -0,0 +1,146 @@
+import logging
+import sys
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import ClassVar, List
+
+import pytest
+from boto3.dynamodb.conditions import Attr
+from pytest import MonkeyPatch
+
+from logger import MyLogger
+from logger.borg_default import BorgDefaultFunctions
+from logger.json_log_formatter import FastJsonLogFormatter, JsonLogFormatter
+from models.article import Article, StateArticle
+
+logger = MyLogger(__name__)
+
+
+@dataclass()
+class Child:
+    value: Decimal
+
+
+@dataclass()
+class Parent:
+    name: str
+    children: List[Child] = field(default_factory=list)
+    kind: ClassVar[str] = "parent"
+
+
+def create_record(msg: str = "message", args: tuple = (), **kwargs):
+    return logging.makeLogRecord(
+        {
+            "name": __name__,
+            "levelname": "DEBUG",
+            "levelno": logging.DEBUG,
+            "pathname": __file__,
+            "msg": msg,
+            "args": args,
+            **kwargs,
+        }
+    )
+
+
+def create_exc_info():
+    try:
+        raise ValueError("broken")
+    except ValueError:
+        return sys.exc_info()
+
+
+class TestFastJsonLogFormatter:
+    @pytest.mark.parametrize(
+        "record",
+        [
+            create_record(),
+            create_record('日本語 %s "quoted"\n', ("テスト",)),
+            create_record(exc_info=(None, None, None)),
+            create_record(exc_info=create_exc_info()),
+            create_record(additional_data={}),
+            create_record(
+                additional_data={
+                    "decimal": Decimal("1.5"),
+                    "integer": Decimal("3"),
+                    "bytes": b"\xff\x00",
+                    "text": b"text",
+                    "condition": Attr("url").eq("a"),
+                    "args": ("a", 1, None, [True, 1.25]),
+                }
+            ),
+            create_record(
+                additional_data={
+                    "article": Article(
+                        url="https://e-hentai.org/g/1/abc/",
+                        status=StateArticle.Inserted,
+                        created_at="2022-01-09 16:17:22.123456+09:00",
+                        updated_at="2022-01-09 16:17:22.123456+09:00",
+                    ),
+                    "parent": [Parent("a", [Child(Decimal("0.1"))]), Parent("b")],
+                    "object": object,
+                }
+            ),
+        ],
+    )
+    def test_normal(self, record: logging.LogRecord):
+        logger.set_shared_data("aws_request_id", "テスト")
+        expected = JsonLogFormatter().format(record)
+        formatter = FastJsonLogFormatter()
+        assert formatter.format(record) == expected
+        assert formatter.format(record) == expected
+        logger.remove_shared_data("aws_request_id")
+
+    def test_normal_shared_data_changed(self):
+        formatter = FastJsonLogFormatter()
+        record = create_record()
+        for value in ["first", "second"]:
+            logger.set_shared_data("aws_request_id", value)
+            assert formatter.format(record) == JsonLogFormatter().format(record)
+        logger.remove_shared_data("aws_request_id")
+        assert formatter.format(record) == JsonLogFormatter().format(record)
+
+    def test_normal_shared_data_changed_while_encoding(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(
+            BorgDefaultFunctions, "registry", dict(BorgDefaultFunctions.registry)
+        )
+        monkeypatch.setattr(BorgDefaultFunctions, "dispatch_cache", {})
+
+        def change_shared_data(x: Child) -> str:
+            logger.set_shared_data("aws_request_id", "second")
+            return str(x.value)
+
+        logger.register_default_function(Child, change_shared_data)
+        formatter = FastJsonLogFormatter()
+        record = create_record()
+        logger.set_shared_data("aws_request_id", Child(Decimal("1")))
+        formatter.format(record)
+        assert formatter.format(record) == JsonLogFormatter().format(record)
+        logger.remove_shared_data("aws_request_id")
+
+    def test_normal_registered_dataclass(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(
+            BorgDefaultFunctions, "registry", dict(BorgDefaultFunctions.registry)
+        )
+        monkeypatch.setattr(BorgDefaultFunctions, "dispatch_cache", {})
+        record = create_record(
+            additional_data={"parent": Parent("a", [Child(Decimal("0.1"))])}
+        )
+        formatter = FastJsonLogFormatter()
+        # Format once first so the registration has to replace a cached lookup.
+        formatter.format(record)
+        logger.register_default_function(Parent, lambda x: x.name)
+
+        expected = JsonLogFormatter().format(record)
+        assert '"additional_data": {"parent": "a"}' in expected
+        assert formatter.format(record) == expected
+
+    @pytest.mark.parametrize("value", [Parent, float("nan")])
+    def test_normal_edge_values(self, value):
+        record = create_record(additional_data={"value": value})
+        try:
+            expected = JsonLogFormatter().format(record)
+        except Exception as e:
+            with pytest.raises(type(e)):
+                FastJsonLogFormatter().format(record)
+        else:
+            assert FastJsonLogFormatter().format(record) == expected
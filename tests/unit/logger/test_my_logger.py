@@ -0,0 +1,119 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from typing import List
+
+import pytest
+
+from logger import MyLogger
+
+logger = MyLogger(__name__)
+
+
+@logger.logging_function()
+def add_one(value: int) -> int:
+    logger.add_functional_data("value", value)
+    if value < 0:
+        raise ValueError(value)
+    return value + 1
+
+
+@logger.logging_function(write_log=True, with_arg=True, with_return=True)
+def add_two(value: int) -> int:
+    logger.add_functional_data("value", value)
+    if value < 0:
+        raise ValueError(value)
+    return add_one(value) + 1
+
+
+def get_records(caplog: pytest.LogCaptureFixture) -> List[logging.LogRecord]:
+    return [x for x in caplog.records if x.name == __name__]
+
+
+class TestLoggingFunction:
+    def test_normal_without_log(self, caplog: pytest.LogCaptureFixture):
+        caplog.set_level(logging.DEBUG)
+        assert add_one(1) == 2
+        assert get_records(caplog) == []
+        assert logger.stack_function_memo == []
+
+    def test_normal_with_log(self, caplog: pytest.LogCaptureFixture):
+        caplog.set_level(logging.DEBUG)
+        assert add_two(1) == 3
+
+        start, end = [x.__dict__["additional_data"] for x in get_records(caplog)]
+        assert start["func_id"] == end["func_id"]
+        assert start["function_name"] == "add_two"
+        assert start["args"] == (1,)
+        assert end["is_succeed"] is True
+        assert end["memo"] == [{"key": "value", "value": 1}]
+        assert end["result"] == 3
+        assert end["duration"] >= 0
+        assert logger.stack_function_memo == []
+
+    def test_normal_nested_without_memo(self, caplog: pytest.LogCaptureFixture):
+        caplog.set_level(logging.DEBUG)
+
+        @logger.logging_function()
+        def outer(value: int) -> int:
+            return add_two(value)
+
+        assert outer(1) == 3
+
+        start = get_records(caplog)[0].__dict__["additional_data"]
+        assert start["function_name"] == "add_two"
+        assert start["memo"] == [[], []]
+        assert logger.stack_function_memo == []
+
+    @pytest.mark.parametrize("level", [logging.INFO, logging.WARNING])
+    def test_normal_disabled(self, caplog: pytest.LogCaptureFixture, level: int):
+        caplog.set_level(level)
+        assert add_two(1) == 3
+        assert get_records(caplog) == []
+        assert logger.stack_function_memo == []
+
+    @pytest.mark.parametrize(
+        "func, expected", [(add_one, ["add_one"]), (add_two, ["add_two", "add_two"])]
+    )
+    def test_exception(
+        self, caplog: pytest.LogCaptureFixture, func, expected: List[str]
+    ):
+        caplog.set_level(logging.DEBUG)
+        with pytest.raises(ValueError):
+            func(-1)
+
+        records = [x.__dict__["additional_data"] for x in get_records(caplog)]
+        assert [x["function_name"] for x in records] == expected
+        end = records[-1]
+        assert end["is_succeed"] is False
+        assert end["args"] == (-1,)
+        assert end["memo"] == [{"key": "value", "value": -1}]
+        assert "result" not in end
+        assert logger.stack_function_memo == []
+
+
+class TestLoggingFunctionThreads:
+    def test_normal(self, caplog: pytest.LogCaptureFixture):
+        caplog.set_level(logging.DEBUG)
+        barrier = Barrier(2)
+
+        @logger.logging_function(write_log=True)
+        def worker(value: int) -> int:
+            logger.add_functional_data("before", value)
+            barrier.wait()
+            logger.add_functional_data("after", value)
+            return value
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert list(executor.map(worker, [1, 2])) == [1, 2]
+
+        records = [x.__dict__["additional_data"] for x in get_records(caplog)]
+        ends = [x for x in records if "is_succeed" in x]
+        assert len(ends) == 2
+        for end in ends:
+            value = end["memo"][0]["value"]
+            assert end["memo"] == [
+                {"key": "before", "value": value},
+                {"key": "after", "value": value},
+            ]
+        assert logger.stack_function_memo == []
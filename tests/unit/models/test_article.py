@@ -1,12 +1,26 @@
-from typing import List
+from dataclasses import asdict
+from decimal import Decimal
+from typing import List, Optional, Set
 
 import pytest
 from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeSerializer
 from botocore.exceptions import ClientError
 from freezegun import freeze_time
 from mypy_boto3_dynamodb import DynamoDBServiceResource
+from pytest import MonkeyPatch
 
-from models.article import Article, ParsedArticleData, StateArticle
+from models.article import (
+    Article,
+    ParsedArticleData,
+    StateArticle,
+    TransitionConflictError,
+    UnprocessedItemsError,
+    decode_attribute_value,
+    encode_attribute_value,
+)
+from models.article.article import get_attribute_value_client
+from utils.datetime import parse_epoch_ms
 
 
 class TestArticleCreateInsertedItem:
@@ -175,6 +189,310 @@ class TestArticleUpdateToInformed:
         assert article == expected
 
 
+class TestArticleHash:
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal(self):
+        article = Article(
+            url="1223334444",
+            status=StateArticle.Inserted,
+            created_at="2022-01-09 16:17:22.123456+09:00",
+            updated_at="2022-01-09 16:17:22.123456+09:00",
+        )
+        other = Article(
+            url="1223334444",
+            status=StateArticle.Inserted,
+            created_at="2022-01-09 16:17:22.123456+09:00",
+            updated_at="2022-01-09 16:17:22.123456+09:00",
+        )
+        assert hash(article) == hash(other)
+
+        article.append_error_message("test")
+        assert hash(article) != hash(other)
+        other.append_error_message("test")
+        assert hash(article) == hash(other)
+        assert len({article, other}) == 1
+
+
+class TestArticleAttributeValues:
+    @pytest.mark.parametrize(
+        "article",
+        [
+            Article(
+                url="1223334444",
+                status=StateArticle.Inserted,
+                created_at="2022-01-09 16:17:22.123456+09:00",
+                updated_at="2022-01-09 16:17:22.123456+09:00",
+            ),
+            Article(
+                url="xyyzzz",
+                status=StateArticle.Informed,
+                created_at="2022-01-09 16:17:22.123456+09:00",
+                updated_at="2022-09-19 18:39:34.536831+09:00",
+                error_messages=["first", None, ""],
+                title="test",
+                title_ja="テスト",
+                category="Manga",
+                thumbnail="122333",
+            ),
+        ],
+    )
+    def test_normal(self, article: Article):
+        serializer = TypeSerializer()
+        expected = {k: serializer.serialize(v) for k, v in asdict(article).items()}
+
+        actual = article.to_attribute_values()
+        assert actual == expected
+        assert Article.from_attribute_values(actual) == article
+        assert Article.from_attribute_values(actual).get_dirty_fields() == set()
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (1, {"N": "1"}),
+            (Decimal("1.5"), {"N": "1.5"}),
+            (True, {"BOOL": True}),
+            ({"a": ["b", None]}, {"M": {"a": {"L": [{"S": "b"}, {"NULL": True}]}}}),
+        ],
+    )
+    def test_normal_value(self, value, expected):
+        assert encode_attribute_value(value) == expected
+        assert encode_attribute_value(value) == TypeSerializer().serialize(value)
+        assert decode_attribute_value(expected) == value
+
+    @pytest.mark.parametrize("value", [1.5, {"a"}])
+    def test_exception(self, value):
+        with pytest.raises(TypeError):
+            encode_attribute_value(value)
+
+
+class TestArticleGetDirtyFields:
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal(self):
+        article = Article.from_item(
+            {
+                "url": "1223334444",
+                "status": StateArticle.Inserted,
+                "created_at": "2022-01-09 16:17:22.123456+09:00",
+                "updated_at": "2022-01-09 16:17:22.123456+09:00",
+            }
+        )
+        assert article.get_dirty_fields() == set()
+
+        article.append_error_message("test")
+        assert article.get_dirty_fields() == {
+            "updated_at",
+            "updated_at_ms",
+            "error_messages",
+        }
+
+        article.mark_clean()
+        article.update_to_informed(
+            ParsedArticleData(
+                title="test", title_ja="テスト", category="Manga", thumbnail="bbbb"
+            )
+        )
+        assert article.get_dirty_fields() == {
+            "status",
+            "updated_at",
+            "updated_at_ms",
+            "error_messages",
+            "title",
+            "title_ja",
+            "category",
+            "thumbnail",
+            "status_shard",
+        }
+
+    @pytest.mark.parametrize(
+        "article",
+        [
+            Article.create_inserted_item("1223334444"),
+            Article(url="1223334444", status=StateArticle.Inserted),
+        ],
+    )
+    def test_normal_inserted_item(self, article: Article):
+        assert article.get_dirty_fields() == {
+            "url",
+            "status",
+            "created_at",
+            "updated_at",
+            "error_messages",
+            "title",
+            "title_ja",
+            "category",
+            "thumbnail",
+            "status_shard",
+            "created_at_ms",
+            "updated_at_ms",
+            "version",
+        }
+
+
+class TestArticleSave:
+    @pytest.mark.parametrize(
+        "dynamodb, url, messages",
+        [
+            ({"article": "複数データ1"}, "1223334444", ["test"]),
+            ({"article": "複数データ1"}, "1223334444", ["first", "second"]),
+        ],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal_append_error_message(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        url: str,
+        messages: List[str],
+    ):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        for message in messages:
+            article.append_error_message(message)
+
+        requests: List[dict] = []
+        update_item = table.meta.client.update_item
+
+        def spy(**kwargs):
+            requests.append(kwargs)
+            return update_item(**kwargs)
+
+        monkeypatch.setattr(table.meta.client, "update_item", spy)
+        article.save(table)
+
+        assert Article.get_item(url, table) == article
+        assert article.get_dirty_fields() == set()
+        assert len(requests) == 1
+        assert set(requests[0]["ExpressionAttributeNames"].values()) == {
+            "updated_at",
+            "updated_at_ms",
+            "error_messages",
+            "version",
+        }
+        assert "list_append" in requests[0]["UpdateExpression"]
+        assert article.version == 1
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal_update_to_informed(
+        self, dynamodb: DynamoDBServiceResource, url: str
+    ):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        article.append_error_message("test")
+        article.update_to_informed(
+            ParsedArticleData(
+                title="test", title_ja="テスト", category="Manga", thumbnail="bbbb"
+            )
+        )
+        article.save(table)
+
+        actual = Article.get_item(url, table)
+        assert actual == article
+        assert actual.error_messages == []
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_inserted_item(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        article = Article.create_inserted_item("1223334444")
+        article.save(table)
+
+        assert Article.get_item("1223334444", table) == article
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_constructed_item(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        article = Article(
+            url="1223334444",
+            status=StateArticle.Inserted,
+            created_at="2022-01-09 16:17:22.123456+09:00",
+            updated_at="2022-01-09 16:17:22.123456+09:00",
+            title="test",
+        )
+        article.save(table)
+
+        assert Article.get_item("1223334444", table) == article
+        assert article.version == 1
+        assert article.get_dirty_fields() == set()
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_normal_not_dirty(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource, url: str
+    ):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        monkeypatch.setattr(table.meta.client, "update_item", lambda **_: pytest.fail())
+        article.save(table)
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_exception_with_condition(
+        self, dynamodb: DynamoDBServiceResource, url: str
+    ):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        article.append_error_message("test")
+
+        with pytest.raises(ClientError):
+            article.save(table, Attr("status").eq(StateArticle.Informed.value))
+        assert article.get_dirty_fields() == {
+            "updated_at",
+            "updated_at_ms",
+            "error_messages",
+        }
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_normal_with_condition(self, dynamodb: DynamoDBServiceResource, url: str):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        article.append_error_message("test")
+        article.save(table, Attr("status").eq(StateArticle.Inserted.value))
+
+        assert Article.get_item(url, table) == article
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal_with_compound_condition(
+        self, dynamodb: DynamoDBServiceResource, url: str
+    ):
+        # boto3 names condition values :v0, :v1, ...; save must not reuse them.
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        article.update_to_informed(
+            ParsedArticleData(
+                title="test", title_ja="テスト", category="Manga", thumbnail="bbbb"
+            )
+        )
+        article.save(
+            table,
+            Attr("status").eq(StateArticle.Inserted.value) & Attr("updated_at").ne(""),
+        )
+
+        actual = Article.get_item(url, table)
+        assert actual == article
+        assert actual.status == StateArticle.Informed
+        assert actual.updated_at == "2022-01-20 16:17:22.123456+09:00"
+
+
 class TestArticlePutItem:
     @pytest.mark.parametrize(
         "dynamodb, article, expected",
@@ -193,6 +511,7 @@ class TestArticlePutItem:
                         status=StateArticle.Inserted,
                         created_at="2022-01-09 16:17:22.123456+09:00",
                         updated_at="2022-01-09 16:17:22.123456+09:00",
+                        version=1,
                     )
                 ],
             ),
@@ -210,6 +529,7 @@ class TestArticlePutItem:
                         status=StateArticle.Inserted,
                         created_at="2022-01-09 16:17:22.123456+09:00",
                         updated_at="2022-01-20 16:17:22.123456+09:00",
+                        version=1,
                     )
                 ],
             ),
@@ -246,6 +566,7 @@ class TestArticlePutItem:
                         status=StateArticle.Inserted,
                         created_at="2022-01-09 16:17:22.123456+09:00",
                         updated_at="2022-01-09 16:17:22.123456+09:00",
+                        version=1,
                     )
                 ],
             ),
@@ -282,6 +603,7 @@ class TestArticlePutItem:
                         status=StateArticle.Inserted,
                         created_at="2022-01-09 16:17:22.123456+09:00",
                         updated_at="2022-01-20 16:17:22.123456+09:00",
+                        version=1,
                     )
                 ],
             ),
@@ -300,6 +622,127 @@ class TestArticlePutItem:
         except ClientError as e:
             assert e.response["Error"]["Code"] == "ConditionalCheckFailedException"
 
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_exception_stale_version(self, dynamodb: DynamoDBServiceResource, url: str):
+        table = dynamodb.Table("article")
+        current = Article.get_item(url, table)
+        stale = Article.get_item(url, table)
+        current.append_error_message("current")
+        current.put_item(table)
+        current.append_error_message("again")
+        current.put_item(table)
+
+        stale.append_error_message("stale")
+        with pytest.raises(ClientError) as e:
+            stale.put_item(table)
+        assert e.value.response["Error"]["Code"] == "ConditionalCheckFailedException"
+        assert Article.get_item(url, table) == current
+        assert current.version == 2
+
+
+class TestArticleInsertItems:
+    @pytest.mark.parametrize(
+        "dynamodb, urls, expected",
+        [
+            ({"article": "複数データ1"}, ["1223334444", "new1", "new2"], ["new1", "new2"]),
+            ({"article": None}, [], []),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(
+        self, dynamodb: DynamoDBServiceResource, urls: List[str], expected: List[str]
+    ):
+        table = dynamodb.Table("article")
+        before = {x["url"]: x for x in table.scan().get("Items", [])}
+        articles = [Article.create_inserted_item(x) for x in urls]
+
+        actual = Article.insert_items(articles, table)
+
+        assert [x.url for x in actual] == expected
+        after = {x["url"]: x for x in table.scan().get("Items", [])}
+        assert {k: after[k] for k in before} == before
+        assert set(after) == set(before) | set(expected)
+        assert all(x.version == 1 for x in actual)
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_chunks(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        # moto rolls a cancelled transaction back by restoring a snapshot of
+        # every table, which drops writes committed concurrently.
+        monkeypatch.setattr("models.article.article.INSERT_WORKERS", 1)
+        table = dynamodb.Table("article")
+        articles = [Article.create_inserted_item(f"url{i}") for i in range(60)]
+        Article.insert_items(articles[:10:3], table)
+
+        actual = Article.insert_items(articles, table)
+
+        assert actual == [x for i, x in enumerate(articles) if i >= 10 or i % 3 != 0]
+        assert set([Article(**x) for x in table.scan().get("Items", [])]) == set(
+            articles
+        )
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_retry_conflict(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        client = get_attribute_value_client(table)
+        transact_write_items = client.transact_write_items
+        calls: List[int] = []
+
+        def conflict_once(**kwargs):
+            calls.append(len(kwargs["TransactItems"]))
+            if len(calls) == 1:
+                raise ClientError(
+                    {
+                        "Error": {"Code": "TransactionCanceledException"},
+                        "CancellationReasons": [
+                            {"Code": "TransactionConflict"},
+                            {"Code": "None"},
+                        ],
+                    },
+                    "TransactWriteItems",
+                )
+            return transact_write_items(**kwargs)
+
+        monkeypatch.setattr(client, "transact_write_items", conflict_once)
+        monkeypatch.setattr("models.article.article.sleep_with_backoff", lambda _: None)
+        articles = [Article.create_inserted_item(x) for x in ["new1", "new2"]]
+
+        assert Article.insert_items(articles, table) == articles
+        assert calls == [2, 2]
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_exception(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+
+        def throttled(**kwargs):
+            raise ClientError(
+                {
+                    "Error": {"Code": "TransactionCanceledException"},
+                    "CancellationReasons": [{"Code": "ThrottlingError"}],
+                },
+                "TransactWriteItems",
+            )
+
+        monkeypatch.setattr(
+            get_attribute_value_client(table), "transact_write_items", throttled
+        )
+        monkeypatch.setattr("models.article.article.sleep_with_backoff", lambda _: None)
+        article = Article.create_inserted_item("new")
+
+        with pytest.raises(ClientError):
+            Article.insert_items([article], table)
+        assert article.version == 0
+        assert table.scan().get("Items", []) == []
+
 
 class TestArticleGetItem:
     @pytest.mark.parametrize(
@@ -434,3 +877,470 @@ class TestArticleQuery:
         table = dynamodb.Table("article")
         actual = Article.query(status, table, limit=1)
         assert set(actual) == set(expected)
+
+
+class TestArticleIterQuery:
+    @pytest.mark.parametrize(
+        "dynamodb, limit, page_size, prefetch, expected",
+        [
+            ({"article": "複数データ1"}, None, None, True, 2),
+            ({"article": "複数データ1"}, None, 1, True, 2),
+            ({"article": "複数データ1"}, None, 1, False, 2),
+            ({"article": "複数データ1"}, 1, None, True, 1),
+            ({"article": "複数データ1"}, 1, 5, True, 1),
+            ({"article": "複数データ1"}, 3, 1, True, 2),
+            ({"article": "複数データ1"}, 0, None, True, 0),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        limit: Optional[int],
+        page_size: Optional[int],
+        prefetch: bool,
+        expected: int,
+    ):
+        table = dynamodb.Table("article")
+        actual = list(
+            Article.iter_query(
+                StateArticle.Inserted,
+                table,
+                limit=limit,
+                page_size=page_size,
+                prefetch=prefetch,
+            )
+        )
+        assert len(actual) == expected
+        assert len({x.url for x in actual}) == expected
+        assert {x.url for x in actual} <= {"1223334444", "abbcccdddd"}
+
+    @pytest.mark.parametrize(
+        "dynamodb, projection, expected",
+        [
+            (
+                {"article": "複数データ1"},
+                ["title", "category"],
+                [
+                    {
+                        "url": "xyyzzz",
+                        "status": "informed",
+                        "title": "test",
+                        "category": "Manga",
+                    }
+                ],
+            ),
+            (
+                {"article": "複数データ1"},
+                ["created_at"],
+                [
+                    {
+                        "url": "xyyzzz",
+                        "status": "informed",
+                        "created_at": "2022-01-09 16:17:22.123456+09:00",
+                    }
+                ],
+            ),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal_with_projection(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        projection: List[str],
+        expected: List[dict],
+    ):
+        table = dynamodb.Table("article")
+        actual = list(
+            Article.iter_query_items(
+                StateArticle.Informed, table, projection=projection
+            )
+        )
+        assert actual == expected
+
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_stop_early(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        iterator = Article.iter_query(StateArticle.Inserted, table, page_size=1)
+        first = next(iterator)
+        iterator.close()
+        assert first.status == StateArticle.Inserted
+
+
+class TestArticleBuildStatusShard:
+    @pytest.mark.parametrize(
+        "status, url, expected",
+        [
+            (StateArticle.Inserted, "1223334444", "inserted#6"),
+            ("inserted", "abbcccdddd", "inserted#7"),
+            (StateArticle.Informed, "xyyzzz", "informed#7"),
+        ],
+    )
+    def test_normal(self, status: StateArticle, url: str, expected: str):
+        assert Article.build_status_shard(status, url) == expected
+        assert expected in Article.build_status_shards(status)
+        assert Article(url=url, status=status).status_shard == expected
+
+    def test_normal_update_to_informed(self):
+        article = Article.create_inserted_item("1223334444")
+        article.update_to_informed(
+            ParsedArticleData(
+                title="test", title_ja="テスト", category="Manga", thumbnail="bbbb"
+            )
+        )
+        assert article.status_shard == "informed#6"
+
+
+class TestArticleQueryShards:
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        articles = [Article.create_inserted_item(f"url{i}") for i in range(40)]
+        Article.insert_items(articles, table)
+        Article.create_inserted_item("informed").put_item(table)
+        table.update_item(
+            Key={"url": "informed"},
+            UpdateExpression="SET #status = :status, #shard = :shard",
+            ExpressionAttributeNames={"#status": "status", "#shard": "status_shard"},
+            ExpressionAttributeValues={
+                ":status": StateArticle.Informed.value,
+                ":shard": Article.build_status_shard(StateArticle.Informed, "informed"),
+            },
+        )
+
+        assert len({x.status_shard for x in articles}) > 1
+        assert set(Article.query(StateArticle.Inserted, table)) == set(articles)
+        assert set(Article.query(StateArticle.Inserted, table, limit=3)) == set(
+            articles
+        )
+        assert set(Article.iter_query(StateArticle.Inserted, table)) == set(articles)
+        assert len(list(Article.iter_query(StateArticle.Inserted, table, 7))) == 7
+        assert [x.url for x in Article.query(StateArticle.Informed, table)] == [
+            "informed"
+        ]
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_thread_safe_client(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        articles = [Article.create_inserted_item(f"url{i}") for i in range(10)]
+        Article.insert_items(articles, table)
+        # Shard workers must not share the resource across threads.
+        monkeypatch.setattr(table, "query", lambda **_: pytest.fail())
+
+        assert set(Article.query(StateArticle.Inserted, table)) == set(articles)
+        assert set(Article.iter_query(StateArticle.Inserted, table)) == set(articles)
+        assert set(Article.query_updated_since(StateArticle.Inserted, table, 0)) == set(
+            articles
+        )
+
+
+class TestArticleBackfillIndexKeys:
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        table.update_item(
+            Key={"url": "1223334444"}, UpdateExpression="REMOVE status_shard"
+        )
+        table.update_item(
+            Key={"url": "xyyzzz"},
+            UpdateExpression="REMOVE status_shard, created_at_ms, updated_at_ms",
+        )
+        assert len(Article.query(StateArticle.Inserted, table)) == 1
+        written: List[str] = []
+
+        def listener(name: str, urls: List[str]):
+            written.extend(urls)
+
+        Article.add_write_listener(listener)
+
+        assert Article.backfill_index_keys(table) == 2
+        assert Article.backfill_index_keys(table) == 0
+        assert sorted(written) == ["1223334444", "xyyzzz"]
+        assert len(Article.query(StateArticle.Inserted, table)) == 2
+        assert len(Article.query(StateArticle.Informed, table)) == 1
+        assert Article.query_updated_since(
+            StateArticle.Informed, table, 1663580374536
+        ) == [Article.get_item("xyyzzz", table)]
+
+
+class TestArticleQueryTimeRange:
+    @pytest.fixture()
+    def table(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        articles = []
+        for i in range(6):
+            with freeze_time(f"2022-01-20 1{i}:00:00+09:00"):
+                articles.append(Article.create_inserted_item(f"url{i}"))
+        # url0 was created early but updated inside the later range.
+        with freeze_time("2022-01-20 18:00:00+09:00"):
+            articles[0].append_error_message("test")
+        Article.insert_items(articles, table)
+        return table
+
+    @pytest.mark.parametrize(
+        "dynamodb, since, until, limit, expected",
+        [
+            ({"article": None}, "2022-01-20 13:00:00+09:00", None, None, [3, 4, 5, 0]),
+            (
+                {"article": None},
+                "2022-01-20 12:00:00+09:00",
+                "2022-01-20 14:00:00+09:00",
+                None,
+                [2, 3, 4],
+            ),
+            ({"article": None}, "2022-01-20 11:00:00+09:00", None, 2, [1, 2]),
+            ({"article": None}, "2022-01-20 19:00:00+09:00", None, None, []),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal_updated_since(
+        self,
+        table,
+        since: str,
+        until: Optional[str],
+        limit: Optional[int],
+        expected: List[int],
+    ):
+        actual = Article.query_updated_since(
+            StateArticle.Inserted,
+            table,
+            parse_epoch_ms(since),
+            None if until is None else parse_epoch_ms(until),
+            limit,
+        )
+        assert [x.url for x in actual] == [f"url{i}" for i in expected]
+
+    @pytest.mark.parametrize(
+        "dynamodb, since, expected",
+        [
+            ({"article": None}, "2022-01-20 13:00:00+09:00", [3, 4, 5]),
+            ({"article": None}, "2022-01-20 10:00:00+09:00", [1, 2, 3, 4, 5, 0]),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal_created_since(self, table, since: str, expected: List[int]):
+        actual = Article.query_created_since(
+            StateArticle.Inserted, table, parse_epoch_ms(since)
+        )
+        assert [x.url for x in actual] == [f"url{i}" for i in expected]
+
+
+class TestArticleGetExistingUrls:
+    @pytest.mark.parametrize(
+        "dynamodb, urls, expected",
+        [
+            ({"article": None}, ["1223334444"], set()),
+            (
+                {"article": "複数データ1"},
+                ["1223334444", "xyyzzz", "unknown"],
+                {"1223334444", "xyyzzz"},
+            ),
+            ({"article": "複数データ1"}, [], set()),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(
+        self, dynamodb: DynamoDBServiceResource, urls: List[str], expected: Set[str]
+    ):
+        table = dynamodb.Table("article")
+        actual = Article.get_existing_urls(urls, table)
+        assert actual == expected
+
+
+class TestArticleGetMany:
+    @pytest.mark.parametrize(
+        "dynamodb, urls, expected_urls, expected_missing",
+        [
+            ({"article": None}, ["1223334444"], [], ["1223334444"]),
+            (
+                {"article": "複数データ1"},
+                ["xyyzzz", "unknown", "1223334444", "xyyzzz"],
+                ["xyyzzz", "1223334444"],
+                ["unknown"],
+            ),
+            ({"article": "複数データ1"}, [], [], []),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        urls: List[str],
+        expected_urls: List[str],
+        expected_missing: List[str],
+    ):
+        table = dynamodb.Table("article")
+        actual = Article.get_many(urls, table)
+        assert [x.url for x in actual.articles] == expected_urls
+        assert actual.articles == [Article.get_item(x, table) for x in expected_urls]
+        assert actual.missing == expected_missing
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_many_chunks(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        articles = [
+            Article(
+                url=f"url{i}",
+                status=StateArticle.Inserted,
+                created_at="2022-01-09 16:17:22.123456+09:00",
+                updated_at="2022-01-09 16:17:22.123456+09:00",
+            )
+            for i in range(250)
+        ]
+        with table.batch_writer() as batch:
+            for x in articles:
+                batch.put_item(Item=asdict(x))
+        urls = [f"url{i}" for i in reversed(range(260))]
+
+        actual = Article.get_many(urls, table)
+        assert [x.url for x in actual.articles] == urls[10:]
+        assert actual.missing == urls[:10]
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_unprocessed(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        monkeypatch.setattr(
+            table.meta.client,
+            "batch_get_item",
+            lambda RequestItems: {"Responses": {}, "UnprocessedKeys": RequestItems},
+        )
+        monkeypatch.setattr("models.article.article.sleep_with_backoff", lambda _: None)
+
+        with pytest.raises(UnprocessedItemsError) as e:
+            Article.get_many(["1223334444", "abbcccdddd"], table)
+        assert len(e.value.items) == 2
+
+
+class TestArticleScanUrls:
+    @pytest.mark.parametrize(
+        "dynamodb, expected",
+        [
+            ({"article": "複数データ1"}, {"1223334444", "abbcccdddd", "xyyzzz"}),
+            ({"article": None}, set()),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_normal(self, dynamodb: DynamoDBServiceResource, expected: Set[str]):
+        actual = Article.scan_urls(dynamodb.Table("article"))
+        assert set(actual) == expected
+
+
+class TestArticleTransitionToInformed:
+    @pytest.mark.parametrize(
+        "dynamodb, url, expected_version",
+        [
+            ({"article": "複数データ1"}, "1223334444", None),
+            ({"article": "複数データ1"}, "1223334444", 0),
+        ],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        url: str,
+        expected_version: Optional[int],
+    ):
+        table = dynamodb.Table("article")
+        data = ParsedArticleData(
+            title="test", title_ja=None, category="Manga", thumbnail="122333"
+        )
+        actual = Article.transition_to_informed(url, data, table, expected_version)
+
+        assert actual == Article(
+            url=url,
+            status=StateArticle.Informed,
+            created_at="2022-01-09 16:17:22.123456+09:00",
+            updated_at="2022-01-20 16:17:22.123456+09:00",
+            title="test",
+            category="Manga",
+            thumbnail="122333",
+            version=1,
+        )
+        assert Article.get_item(url, table) == actual
+
+    @pytest.mark.parametrize(
+        "dynamodb, url, expected_version",
+        [
+            ({"article": "複数データ1"}, "1223334444", 1),
+            ({"article": "複数データ1"}, "xyyzzz", None),
+            ({"article": "複数データ1"}, "not-exists", None),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_exception_conflict(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        url: str,
+        expected_version: Optional[int],
+    ):
+        table = dynamodb.Table("article")
+        data = ParsedArticleData(
+            title="test", title_ja=None, category="Manga", thumbnail="122333"
+        )
+        with pytest.raises(TransitionConflictError) as e:
+            Article.transition_to_informed(url, data, table, expected_version)
+        assert e.value.url == url
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_exception_lost_race(self, dynamodb: DynamoDBServiceResource, url: str):
+        table = dynamodb.Table("article")
+        article = Article.get_item(url, table)
+        Article.record_error(url, "other worker", table, expected_version=0)
+
+        data = ParsedArticleData(
+            title="test", title_ja=None, category="Manga", thumbnail="122333"
+        )
+        with pytest.raises(TransitionConflictError):
+            Article.transition_to_informed(url, data, table, article.version)
+        assert Article.get_item(url, table).status == StateArticle.Inserted
+
+
+class TestArticleRecordError:
+    @pytest.mark.parametrize(
+        "dynamodb, url, messages",
+        [
+            ({"article": "複数データ1"}, "1223334444", ["test"]),
+            ({"article": "複数データ1"}, "1223334444", ["first", "second"]),
+        ],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal(
+        self, dynamodb: DynamoDBServiceResource, url: str, messages: List[str]
+    ):
+        table = dynamodb.Table("article")
+        for x in messages:
+            actual = Article.record_error(url, x, table)
+
+        assert actual.error_messages == messages
+        assert actual.status == StateArticle.Inserted
+        assert actual.updated_at == "2022-01-20 16:17:22.123456+09:00"
+        assert actual.version == len(messages)
+        assert Article.get_item(url, table) == actual
+
+    @pytest.mark.parametrize(
+        "dynamodb, url, expected_status",
+        [
+            ({"article": "複数データ1"}, "xyyzzz", StateArticle.Inserted),
+            ({"article": "複数データ1"}, "1223334444", StateArticle.Informed),
+        ],
+        indirect=["dynamodb"],
+    )
+    def test_exception_conflict(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        url: str,
+        expected_status: StateArticle,
+    ):
+        table = dynamodb.Table("article")
+        with pytest.raises(TransitionConflictError):
+            Article.record_error(url, "test", table, expected_status)
@@ -0,0 +1,172 @@
+import gc
+from typing import List
+
+import pytest
+from freezegun import freeze_time
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from pytest import MonkeyPatch
+
+import models.article.article as article_module
+from models.article import (
+    Article,
+    ArticleCache,
+    CacheStats,
+    ParsedArticleData,
+    StateArticle,
+)
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def count_calls(monkeypatch: MonkeyPatch, target: str) -> List[int]:
+    calls = [0]
+    original = getattr(Article, target)
+
+    def wrapper(*args, **kwargs):
+        calls[0] += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(Article, target, staticmethod(wrapper))
+    return calls
+
+
+class TestArticleCacheGetItem:
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal(self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        calls = count_calls(monkeypatch, "get_item")
+        cache = ArticleCache()
+
+        first = cache.get_item("1223334444", table)
+        second = cache.get_item("1223334444", table)
+
+        assert first == second
+        assert first is not second
+        assert calls[0] == 1
+        assert cache.stats == CacheStats(hits=1, misses=1)
+
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal_ttl(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        calls = count_calls(monkeypatch, "get_item")
+        clock = FakeClock()
+        cache = ArticleCache(ttl=10, clock=clock)
+
+        cache.get_item("1223334444", table)
+        clock.now = 9.9
+        cache.get_item("1223334444", table)
+        clock.now = 10.0
+        cache.get_item("1223334444", table)
+
+        assert calls[0] == 2
+        assert cache.stats == CacheStats(hits=1, misses=2, expirations=1)
+
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal_eviction(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        calls = count_calls(monkeypatch, "get_item")
+        cache = ArticleCache(max_size=2)
+
+        cache.get_item("1223334444", table)
+        cache.get_item("abbcccdddd", table)
+        cache.get_item("1223334444", table)
+        cache.get_item("xyyzzz", table)
+        cache.get_item("1223334444", table)
+        cache.get_item("abbcccdddd", table)
+
+        assert calls[0] == 4
+        assert cache.stats == CacheStats(hits=2, misses=4, evictions=2)
+
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal_invalidation(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        cache = ArticleCache()
+
+        article = cache.get_item("1223334444", table)
+        article.append_error_message("test")
+        article.put_item(table)
+        assert cache.get_item("1223334444", table) == article
+
+        article.append_error_message("second")
+        article.save(table)
+        assert cache.get_item("1223334444", table) == article
+
+        Article.transition_to_informed(
+            "1223334444",
+            ParsedArticleData(
+                title="test", title_ja=None, category="Manga", thumbnail="bbbb"
+            ),
+            table,
+        )
+        assert cache.get_item("1223334444", table).error_messages == []
+        assert cache.stats.invalidations == 3
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_exception(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        cache = ArticleCache()
+        with pytest.raises(KeyError):
+            cache.get_item("1223334444", table)
+
+
+class TestArticleCacheGetMany:
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal(self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        cache = ArticleCache()
+        cache.get_item("xyyzzz", table)
+        requested: List[List[str]] = []
+        get_many = Article.get_many
+
+        def spy(urls: List[str], table):
+            requested.append(urls)
+            return get_many(urls, table)
+
+        monkeypatch.setattr(Article, "get_many", staticmethod(spy))
+        actual = cache.get_many(["1223334444", "xyyzzz", "unknown"], table)
+
+        assert [x.url for x in actual.articles] == ["1223334444", "xyyzzz"]
+        assert actual.missing == ["unknown"]
+        assert requested == [["1223334444", "unknown"]]
+        assert cache.get_item("1223334444", table).url == "1223334444"
+
+
+class TestArticleCacheQuery:
+    @pytest.mark.parametrize("dynamodb", [{"article": "複数データ1"}], indirect=["dynamodb"])
+    def test_normal(self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        calls = count_calls(monkeypatch, "query")
+        cache = ArticleCache()
+
+        first = cache.query(StateArticle.Inserted, table)
+        assert cache.query(StateArticle.Inserted, table) == first
+        assert calls[0] == 1
+
+        Article.create_inserted_item("new").put_item(table)
+        actual = cache.query(StateArticle.Inserted, table)
+        assert calls[0] == 2
+        assert {x.url for x in actual} == {x.url for x in first} | {"new"}
+
+
+class TestArticleCacheListener:
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        cache = ArticleCache()
+        assert any(x() == cache.invalidate for x in article_module.write_listeners)
+
+        del cache
+        gc.collect()
+        Article.create_inserted_item("1223334444").put_item(table)
+        assert all(x() is not None for x in article_module.write_listeners)
@@ -0,0 +1,211 @@
+from typing import List
+
+import pytest
+from botocore.exceptions import ClientError
+from freezegun import freeze_time
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from pytest import MonkeyPatch
+
+from models.article import (
+    Article,
+    ArticleExistsError,
+    ArticleSession,
+    SessionCommitError,
+    StateArticle,
+)
+from models.article.article import get_attribute_value_client
+
+
+def create_articles(count: int) -> List[Article]:
+    return [
+        Article(
+            url=f"url{i}",
+            status=StateArticle.Inserted,
+            created_at="2022-01-09 16:17:22.123456+09:00",
+            updated_at="2022-01-09 16:17:22.123456+09:00",
+        )
+        for i in range(count)
+    ]
+
+
+class TestArticleSessionCommit:
+    @pytest.mark.parametrize(
+        "dynamodb, count",
+        [({"article": None}, 0), ({"article": None}, 1), ({"article": None}, 60)],
+        indirect=["dynamodb"],
+    )
+    def test_normal_add(self, dynamodb: DynamoDBServiceResource, count: int):
+        table = dynamodb.Table("article")
+        articles = create_articles(count)
+        session = ArticleSession(table)
+        for x in articles:
+            session.add(x)
+        actual = session.commit()
+
+        assert set(actual.written) == set(articles)
+        assert actual.failed == []
+        assert session.pending_count() == 0
+        assert set([Article(**x) for x in table.scan().get("Items", [])]) == set(
+            articles
+        )
+
+    @pytest.mark.parametrize(
+        "dynamodb, urls",
+        [({"article": "複数データ1"}, ["1223334444", "abbcccdddd"])],
+        indirect=["dynamodb"],
+    )
+    @freeze_time("2022-01-20 16:17:22.123456+09:00")
+    def test_normal_track(self, dynamodb: DynamoDBServiceResource, urls: List[str]):
+        table = dynamodb.Table("article")
+        articles = [Article.get_item(x, table) for x in urls]
+        with ArticleSession(table) as session:
+            for x in articles:
+                x.append_error_message("test")
+                session.track(x)
+
+        for x in articles:
+            assert Article.get_item(x.url, table) == x
+            assert x.get_dirty_fields() == set()
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_track_constructed(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        articles = create_articles(3)
+        session = ArticleSession(table)
+        for x in articles:
+            session.track(x)
+        actual = session.commit()
+
+        assert set(actual.written) == set(articles)
+        for x in articles:
+            assert Article.get_item(x.url, table) == x
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_auto_flush(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        session = ArticleSession(table, buffer_size=10)
+        for x in create_articles(25):
+            session.add(x)
+
+        assert session.pending_count() == 5
+        assert len(table.scan().get("Items", [])) == 20
+        assert len(session.commit().written) == 25
+        assert len(table.scan().get("Items", [])) == 25
+
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_normal_rollback(self, dynamodb: DynamoDBServiceResource):
+        table = dynamodb.Table("article")
+        with pytest.raises(RuntimeError):
+            with ArticleSession(table) as session:
+                for x in create_articles(3):
+                    session.add(x)
+                raise RuntimeError()
+
+        assert session.pending_count() == 0
+        assert table.scan().get("Items", []) == []
+
+
+class TestArticleSessionFailed:
+    @pytest.mark.parametrize("dynamodb", [{"article": None}], indirect=["dynamodb"])
+    def test_insert_error(
+        self, monkeypatch: MonkeyPatch, dynamodb: DynamoDBServiceResource
+    ):
+        table = dynamodb.Table("article")
+        client = get_attribute_value_client(table)
+        transact_write_items = client.transact_write_items
+
+        def failing_transact(**kwargs):
+            urls = [x["Put"]["Item"]["url"]["S"] for x in kwargs["TransactItems"]]
+            if "url1" in urls:
+                raise ClientError(
+                    {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                    "TransactWriteItems",
+                )
+            return transact_write_items(**kwargs)
+
+        monkeypatch.setattr(client, "transact_write_items", failing_transact)
+        monkeypatch.setattr("models.article.session.TRANSACT_WRITE_SIZE", 2)
+
+        session = ArticleSession(table)
+        for x in create_articles(5):
+            session.add(x)
+        actual = session.commit()
+
+        assert sorted(x.url for x in actual.written) == ["url2", "url3", "url4"]
+        assert sorted(x.article.url for x in actual.failed) == ["url0", "url1"]
+        assert all(isinstance(x.error, ClientError) for x in actual.failed)
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_existing(self, dynamodb: DynamoDBServiceResource, url: str):
+        table = dynamodb.Table("article")
+        expected = Article.get_item(url, table)
+
+        with pytest.raises(SessionCommitError) as e:
+            with ArticleSession(table) as session:
+                session.add(Article.create_inserted_item("new"))
+                session.add(Article.create_inserted_item(url))
+
+        assert [x.url for x in e.value.result.written] == ["new"]
+        assert [x.article.url for x in e.value.result.failed] == [url]
+        assert isinstance(e.value.result.failed[0].error, ArticleExistsError)
+        assert Article.get_item(url, table) == expected
+        assert Article.get_item("new", table).version == 1
+
+    @pytest.mark.parametrize(
+        "dynamodb, url",
+        [({"article": "複数データ1"}, "1223334444")],
+        indirect=["dynamodb"],
+    )
+    def test_rollback_after_failed_flush(
+        self, dynamodb: DynamoDBServiceResource, url: str
+    ):
+        table = dynamodb.Table("article")
+        with pytest.raises(RuntimeError):
+            with ArticleSession(table, buffer_size=1) as session:
+                session.add(Article.create_inserted_item(url))
+                raise RuntimeError()
+
+        assert [x.article.url for x in session.last_result.failed] == [url]
+
+    @pytest.mark.parametrize(
+        "dynamodb, urls",
+        [({"article": "複数データ1"}, ["1223334444", "abbcccdddd"])],
+        indirect=["dynamodb"],
+    )
+    def test_update_error(
+        self,
+        monkeypatch: MonkeyPatch,
+        dynamodb: DynamoDBServiceResource,
+        urls: List[str],
+    ):
+        table = dynamodb.Table("article")
+        update_item = table.meta.client.update_item
+
+        def failing_update(**kwargs):
+            if kwargs["Key"]["url"] == "abbcccdddd":
+                raise ClientError(
+                    {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+                    "UpdateItem",
+                )
+            return update_item(**kwargs)
+
+        monkeypatch.setattr(table.meta.client, "update_item", failing_update)
+
+        session = ArticleSession(table)
+        for x in [Article.get_item(x, table) for x in urls]:
+            x.append_error_message("test")
+            session.track(x)
+        actual = session.commit()
+
+        assert [x.url for x in actual.written] == ["1223334444"]
+        assert [x.article.url for x in actual.failed] == ["abbcccdddd"]
+        assert isinstance(actual.failed[0].error, ClientError)
+        assert actual.failed[0].article.get_dirty_fields() == {
+            "updated_at",
+            "updated_at_ms",
+            "error_messages",
+        }
@@ -0,0 +1,336 @@
+from typing import FrozenSet, List, Optional
+
+import pytest
+from pytest import MonkeyPatch
+
+from models.entry import (
+    EntryFilter,
+    EntrySummary,
+    FilterRules,
+    TagSet,
+    TagVocabulary,
+    parse_category,
+    parse_tags,
+)
+
+RULES = FilterRules(
+    categories=frozenset(["Manga", "Artist CG", "Doujinshi"]),
+    namespace_allowlists={"language": frozenset(["japanese"])},
+)
+
+
+class TestParseCategory:
+    @pytest.mark.parametrize(
+        "title, expected",
+        [
+            ("[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi", "Doujinshi"),
+            ("[Artist CG] beautiful", "Artist CG"),
+        ],
+    )
+    def test_normal(self, title: str, expected: str):
+        assert parse_category(title) == expected
+
+
+class TestParseTags:
+    @pytest.mark.parametrize(
+        "summary, expected",
+        [
+            (
+                "language:chinese, language:translated, male:first person perspective, other:story arc 无授权转载，侵删",
+                frozenset(
+                    [
+                        "language:chinese",
+                        "language:translated",
+                        "male:first person perspective",
+                        "other:story arc",
+                    ]
+                ),
+            ),
+            (
+                "parody:last origin, female:swimsuit ALL NEW ART IS AT THE END, New art:Hyena Swimsuit",
+                frozenset(["parody:last origin", "female:swimsuit"]),
+            ),
+            (
+                "artist:itami, other:multi-work series https://www.dlsite.com/work/=/product_id/BJ580856.html",
+                frozenset(["artist:itami", "other:multi-work series"]),
+            ),
+            (
+                "female:yuri, language:japanese <comment>",
+                frozenset(["female:yuri", "language:japanese"]),
+            ),
+            (
+                "female:yuri, language:japanese translated by anon",
+                frozenset(["female:yuri", "language:japanese translated by anon"]),
+            ),
+            ("No language here", frozenset()),
+            (None, frozenset()),
+        ],
+    )
+    def test_normal(self, summary: Optional[str], expected: FrozenSet[str]):
+        assert parse_tags(summary) == expected
+
+
+class TestTagVocabularyIntern:
+    @pytest.mark.parametrize("name", ["language", "japanese"])
+    def test_normal(self, name: str):
+        id_ = TagVocabulary().intern(name)
+        assert TagVocabulary().intern(name) == id_
+        assert TagVocabulary().name(id_) == name
+
+
+class TestTagVocabularyResetIfFull:
+    @pytest.fixture(autouse=True)
+    def isolated_vocabulary(self, monkeypatch: MonkeyPatch):
+        monkeypatch.setattr(TagVocabulary, "ids", {})
+        monkeypatch.setattr(TagVocabulary, "names", [])
+        monkeypatch.setattr(TagVocabulary, "tags", {})
+
+    @pytest.mark.parametrize("limit, expected", [(4, True), (5, False)])
+    def test_normal(self, limit: int, expected: bool):
+        TagSet.parse("language:japanese, female:yuri")
+
+        assert TagVocabulary().reset_if_full(limit) == expected
+        assert (len(TagVocabulary().names) == 0) == expected
+        assert (len(TagVocabulary().tags) == 0) == expected
+        assert TagSet.parse("female:yuri").has("female", "yuri")
+
+
+class TestTagSet:
+    @pytest.mark.parametrize(
+        "summary, namespace, value, expected",
+        [
+            ("language:chinese, language:translated", "language", "chinese", True),
+            ("language:chinese, language:translated", "language", "japanese", False),
+            ("language:chinese", "female", "chinese", False),
+            ("female:yuri", "never-seen-namespace", "yuri", False),
+            (None, "language", "chinese", False),
+        ],
+    )
+    def test_has(self, summary: Optional[str], namespace: str, value: str, expected):
+        assert TagSet.parse(summary).has(namespace, value) == expected
+
+    @pytest.mark.parametrize(
+        "summary, namespace, expected",
+        [
+            ("female:yuri, language:chinese", "language", True),
+            ("female:yuri, male:yaoi", "language", False),
+            ("female:yuri, male:yaoi", "never-seen-namespace", False),
+        ],
+    )
+    def test_has_namespace(self, summary: str, namespace: str, expected: bool):
+        assert TagSet.parse(summary).has_namespace(namespace) == expected
+
+    @pytest.mark.parametrize(
+        "summary, namespace, expected",
+        [
+            (
+                "language:chinese, female:yuri, language:translated",
+                "language",
+                ["chinese", "translated"],
+            ),
+            ("female:yuri", "language", []),
+        ],
+    )
+    def test_namespace_values(self, summary: str, namespace: str, expected):
+        assert sorted(TagSet.parse(summary).namespace_values(namespace)) == expected
+
+    @pytest.mark.parametrize(
+        "summary0, summary1, expected",
+        [
+            ("female:yuri, language:chinese", "language:chinese, female:yuri", True),
+            ("female:yuri", "female:yuri, female:yuri", True),
+            ("female:yuri", "male:yaoi", False),
+        ],
+    )
+    def test_eq(self, summary0: str, summary1: str, expected: bool):
+        actual = TagSet.parse(summary0) == TagSet.parse(summary1)
+        assert actual == expected
+
+
+class TestEntrySummaryTags:
+    @pytest.mark.parametrize(
+        "entry, expected",
+        [
+            (
+                EntrySummary(
+                    link="1", title="[Manga] a", summary="female:yuri, other:x"
+                ),
+                frozenset(["female:yuri", "other:x"]),
+            ),
+            (EntrySummary(link="1", title="[Manga] a", summary=None), frozenset()),
+        ],
+    )
+    def test_normal(self, entry: EntrySummary, expected: FrozenSet[str]):
+        assert frozenset(entry.tags) == expected
+        assert len(entry.tags) == len(expected)
+
+    def test_normal_lazy(self, monkeypatch: MonkeyPatch):
+        calls: List[Optional[str]] = []
+        parse = TagSet.parse
+
+        def spy(summary: Optional[str]) -> TagSet:
+            calls.append(summary)
+            return parse(summary)
+
+        monkeypatch.setattr(TagSet, "parse", staticmethod(spy))
+        rejected = EntrySummary(link="1", title="[Non-H] a", summary="female:yuri")
+        accepted = EntrySummary(link="2", title="[Manga] b", summary="male:yaoi")
+        assert calls == []
+
+        assert EntryFilter(RULES).filter([rejected, accepted]) == [accepted]
+        assert calls == ["male:yaoi"]
+        assert accepted.tags == parse("male:yaoi")
+        assert calls == ["male:yaoi"]
+
+
+class TestFilterRulesFromJson:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            (
+                '{"categories": ["Manga"], "exclude_tags": ["other:ai generated"], "namespace_allowlists": {"language": ["japanese", "english"]}}',
+                FilterRules(
+                    categories=frozenset(["Manga"]),
+                    exclude_tags=frozenset(["other:ai generated"]),
+                    namespace_allowlists={
+                        "language": frozenset(["japanese", "english"])
+                    },
+                ),
+            ),
+            ("{}", FilterRules()),
+        ],
+    )
+    def test_normal(self, text: str, expected: FilterRules):
+        assert FilterRules.from_json(text) == expected
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"include_tags": ["japanese"]}',
+            '{"exclude_tags": ["other:ai generated", ":yuri"]}',
+            '{"exclude_tags": ["female:"]}',
+        ],
+    )
+    def test_exception(self, text: str):
+        with pytest.raises(ValueError, match="namespace:value"):
+            FilterRules.from_json(text)
+
+
+class TestEntryFilterMatches:
+    @pytest.mark.parametrize(
+        "rules, entry, expected",
+        [
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi",
+                    summary="parody:original, group:ins-mode",
+                ),
+                True,
+            ),
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Manga] test",
+                    summary="language:chinese, language:translated, female:milf",
+                ),
+                False,
+            ),
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Manga] test",
+                    summary="language:japanese, language:english",
+                ),
+                True,
+            ),
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Manga] test",
+                    summary="female:yuri the language of flowers",
+                ),
+                True,
+            ),
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Manga] test",
+                    summary="female:yuri, language:japanese translated by anon",
+                ),
+                True,
+            ),
+            (
+                RULES,
+                EntrySummary(
+                    link="1",
+                    title="[Manga] test",
+                    summary="female:yuri, language:chinese translated by anon",
+                ),
+                False,
+            ),
+            (
+                RULES,
+                EntrySummary(link="1", title="[Non-H] test", summary="female:yuri"),
+                False,
+            ),
+            (
+                FilterRules(include_tags=frozenset(["female:yuri"])),
+                EntrySummary(link="1", title="[Non-H] test", summary="female:yuri"),
+                True,
+            ),
+            (
+                FilterRules(include_tags=frozenset(["female:yuri"])),
+                EntrySummary(link="1", title="[Non-H] test", summary="male:yaoi"),
+                False,
+            ),
+            (
+                FilterRules(exclude_tags=frozenset(["male:yaoi"])),
+                EntrySummary(link="1", title="[Manga] test", summary="male:yaoi"),
+                False,
+            ),
+            (
+                RULES,
+                EntrySummary(link="1", title="[Manga] test", summary=None),
+                True,
+            ),
+        ],
+    )
+    def test_normal(self, rules: FilterRules, entry: EntrySummary, expected: bool):
+        assert EntryFilter(rules).matches(entry) == expected
+
+
+class TestEntryFilterFilter:
+    @pytest.mark.parametrize(
+        "rules, entries, expected",
+        [
+            (
+                RULES,
+                [
+                    EntrySummary(link="1", title="[Manga] a", summary="female:yuri"),
+                    EntrySummary(
+                        link="2", title="[Manga] b", summary="language:korean"
+                    ),
+                    EntrySummary(link="3", title="[Western] c", summary="female:yuri"),
+                    EntrySummary(link="4", title="[Artist CG] d", summary="other:x"),
+                ],
+                [
+                    EntrySummary(link="1", title="[Manga] a", summary="female:yuri"),
+                    EntrySummary(link="4", title="[Artist CG] d", summary="other:x"),
+                ],
+            ),
+            (RULES, [], []),
+        ],
+    )
+    def test_normal(
+        self,
+        rules: FilterRules,
+        entries: List[EntrySummary],
+        expected: List[EntrySummary],
+    ):
+        assert EntryFilter(rules).filter(entries) == expected
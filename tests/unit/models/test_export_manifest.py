@@ -0,0 +1,49 @@
+import pytest
+from mypy_boto3_s3 import S3ServiceResource
+
+from models.export_manifest import ExportChunk, ExportManifest
+
+
+class TestExportManifestLoadLatest:
+    @pytest.mark.parametrize("s3", [["data"]], indirect=["s3"])
+    def test_normal_not_exists(self, s3: S3ServiceResource):
+        actual = ExportManifest.load_latest(s3.Bucket("data"))
+        assert actual is None
+
+
+class TestExportManifestSave:
+    @pytest.mark.parametrize(
+        "s3, manifest",
+        [
+            (["data"], ExportManifest(export_id="1", started_at_ms=1)),
+            (
+                ["data"],
+                ExportManifest(
+                    export_id="1663580374536",
+                    started_at_ms=1663580374536,
+                    since_ms=1641712582123,
+                    segments=2,
+                    chunks=[
+                        ExportChunk(
+                            key="export/article/1663580374536/segment-0000-00000.jsonl.gz",
+                            segment=0,
+                            count=2,
+                        ),
+                        ExportChunk(
+                            key="export/article/1663580374536/segment-0001-00000.jsonl.gz",
+                            segment=1,
+                            count=1,
+                        ),
+                    ],
+                ),
+            ),
+        ],
+        indirect=["s3"],
+    )
+    def test_normal(self, s3: S3ServiceResource, manifest: ExportManifest):
+        bucket = s3.Bucket("data")
+        manifest.save(bucket)
+
+        assert ExportManifest.load_latest(bucket) == manifest
+        key = f"{ExportManifest.build_prefix(manifest.export_id)}/manifest.json"
+        assert [x.key for x in bucket.objects.filter(Prefix=key)] == [key]
@@ -0,0 +1,46 @@
+import pytest
+from mypy_boto3_s3 import S3ServiceResource
+
+from models.feed_state import FeedState
+
+
+class TestFeedStateLoad:
+    @pytest.mark.parametrize(
+        "s3, url, expected",
+        [
+            (
+                ["data"],
+                "https://xml.e-hentai.org/ehg.xml",
+                FeedState(url="https://xml.e-hentai.org/ehg.xml"),
+            )
+        ],
+        indirect=["s3"],
+    )
+    def test_normal_not_exists(
+        self, s3: S3ServiceResource, url: str, expected: FeedState
+    ):
+        actual = FeedState.load(url, s3.Bucket("data"))
+        assert actual == expected
+
+
+class TestFeedStateSave:
+    @pytest.mark.parametrize(
+        "s3, state",
+        [
+            (
+                ["data"],
+                FeedState(
+                    url="https://xml.e-hentai.org/ehg.xml",
+                    etag='"abc"',
+                    modified="Sat, 01 Oct 2022 00:00:00 GMT",
+                    last_gid=2330808,
+                ),
+            )
+        ],
+        indirect=["s3"],
+    )
+    def test_normal(self, s3: S3ServiceResource, state: FeedState):
+        bucket = s3.Bucket("data")
+        state.save(bucket)
+        actual = FeedState.load(state.url, bucket)
+        assert actual == state
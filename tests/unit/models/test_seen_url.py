@@ -0,0 +1,95 @@
+from typing import List, Tuple
+
+import pytest
+from mypy_boto3_dynamodb import DynamoDBServiceResource
+from mypy_boto3_s3 import S3ServiceResource
+
+from models.seen_url import SeenUrlCache
+from models.seen_url.seen_url import SNAPSHOT_KEY
+from utils.bloom import BloomFilter
+
+
+def build_cache(confirmed: List[str], bloom_keys: List[str]) -> SeenUrlCache:
+    cache = SeenUrlCache()
+    cache.bloom = BloomFilter.for_capacity(100, 0.01)
+    cache.bloom.update(bloom_keys)
+    cache.add_confirmed(confirmed)
+    return cache
+
+
+class TestSeenUrlCacheLoad:
+    @pytest.mark.parametrize("s3", [["data"]], indirect=["s3"])
+    def test_normal_missing(self, s3: S3ServiceResource):
+        cache = SeenUrlCache()
+        cache.load(s3.Bucket("data"))
+
+        assert cache.bloom is not None
+        assert cache.bloom.count == 0
+        assert list(s3.Bucket("data").objects.all()) == []
+
+    @pytest.mark.parametrize(
+        "s3, keys", [(["data"], ["https://e-hentai.org/g/1/a/"])], indirect=["s3"]
+    )
+    def test_normal_snapshot(self, s3: S3ServiceResource, keys: List[str]):
+        bloom = BloomFilter.for_capacity(100, 0.01)
+        bloom.update(keys)
+        s3.Bucket("data").put_object(Key=SNAPSHOT_KEY, Body=bloom.to_bytes())
+
+        cache = SeenUrlCache()
+        cache.load(s3.Bucket("data"))
+
+        assert cache.bloom is not None
+        assert cache.bloom.bits == bloom.bits
+
+
+class TestSeenUrlCacheRebuild:
+    @pytest.mark.parametrize(
+        "dynamodb, s3, expected",
+        [({"article": "複数データ1"}, ["data"], ["1223334444", "abbcccdddd", "xyyzzz"])],
+        indirect=["dynamodb", "s3"],
+    )
+    def test_normal(
+        self,
+        dynamodb: DynamoDBServiceResource,
+        s3: S3ServiceResource,
+        expected: List[str],
+    ):
+        cache = SeenUrlCache()
+        bloom = cache.rebuild(dynamodb.Table("article"), s3.Bucket("data"), 100)
+
+        assert cache.bloom is bloom
+        assert all(x in bloom for x in expected)
+        body = s3.Object("data", SNAPSHOT_KEY).get()["Body"].read()
+        assert BloomFilter.from_bytes(body).bits == bloom.bits
+
+
+class TestSeenUrlCacheClassify:
+    @pytest.mark.parametrize(
+        "cache, urls, expected",
+        [
+            (
+                build_cache(["a"], ["b"]),
+                ["a", "b", "c"],
+                (["a"], ["b"], ["c"]),
+            ),
+            (SeenUrlCache(), ["a", "b"], ([], ["a", "b"], [])),
+        ],
+    )
+    def test_normal(
+        self,
+        cache: SeenUrlCache,
+        urls: List[str],
+        expected: Tuple[List[str], List[str], List[str]],
+    ):
+        assert cache.classify(urls) == expected
+
+
+class TestSeenUrlCacheAddConfirmed:
+    @pytest.mark.parametrize(
+        "urls, max_confirmed, expected",
+        [(["a", "b", "c"], 2, ["b", "c"]), (["a", "b", "a"], 2, ["b", "a"])],
+    )
+    def test_normal(self, urls: List[str], max_confirmed: int, expected: List[str]):
+        cache = SeenUrlCache(max_confirmed)
+        cache.add_confirmed(urls)
+        assert list(cache.confirmed.keys()) == expected
@@ -0,0 +1,40 @@
+import pytest
+
+from utils.aws import (
+    get_dynamodb_client,
+    get_dynamodb_resource,
+    get_s3_resource,
+    get_session,
+)
+
+
+class TestGetSession:
+    def test_normal(self):
+        assert get_session() is get_session()
+
+
+class TestGetDynamodbResource:
+    def test_normal(self):
+        actual = get_dynamodb_resource()
+        assert actual is get_dynamodb_resource()
+        assert actual.meta.client.meta.service_model.service_name == "dynamodb"
+
+
+class TestGetS3Resource:
+    def test_normal(self):
+        actual = get_s3_resource()
+        assert actual is get_s3_resource()
+        assert actual.meta.client.meta.service_model.service_name == "s3"
+
+
+class TestGetDynamodbClient:
+    @pytest.mark.parametrize(
+        "endpoint_url, region_name",
+        [(None, None), ("http://localhost:4566", "ap-northeast-1")],
+    )
+    def test_normal(self, endpoint_url, region_name):
+        actual = get_dynamodb_client(endpoint_url, region_name)
+        assert actual is get_dynamodb_client(endpoint_url, region_name)
+        assert actual.meta.service_model.service_name == "dynamodb"
+        if endpoint_url is not None:
+            assert actual.meta.endpoint_url == endpoint_url
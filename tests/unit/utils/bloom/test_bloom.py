@@ -0,0 +1,48 @@
+import pytest
+
+from utils.bloom import BloomFilter
+
+
+class TestBloomFilterForCapacity:
+    @pytest.mark.parametrize(
+        "capacity, error_rate, expected_size, expected_hash_count",
+        [(1000, 0.01, 9586, 7), (1000000, 0.01, 9585059, 7)],
+    )
+    def test_normal(
+        self,
+        capacity: int,
+        error_rate: float,
+        expected_size: int,
+        expected_hash_count: int,
+    ):
+        actual = BloomFilter.for_capacity(capacity, error_rate)
+        assert actual.size == expected_size
+        assert actual.hash_count == expected_hash_count
+
+
+class TestBloomFilterContains:
+    @pytest.mark.parametrize("capacity, error_rate", [(1000, 0.01)])
+    def test_normal(self, capacity: int, error_rate: float):
+        bloom = BloomFilter.for_capacity(capacity, error_rate)
+        keys = [f"https://e-hentai.org/g/{x}/token/" for x in range(capacity)]
+        bloom.update(keys)
+
+        assert all(x in bloom for x in keys)
+        others = [f"https://e-hentai.org/g/{x}/other/" for x in range(capacity)]
+        false_positives = len([x for x in others if x in bloom])
+        assert false_positives < capacity * error_rate * 3
+        assert bloom.count <= capacity
+
+
+class TestBloomFilterToBytes:
+    @pytest.mark.parametrize("keys", [["a", "b", "c"], []])
+    def test_normal(self, keys):
+        bloom = BloomFilter.for_capacity(100, 0.01)
+        bloom.update(keys)
+
+        actual = BloomFilter.from_bytes(bloom.to_bytes())
+        assert actual.size == bloom.size
+        assert actual.hash_count == bloom.hash_count
+        assert actual.count == bloom.count
+        assert actual.bits == bloom.bits
+        assert all(x in actual for x in keys)
@@ -1,7 +1,9 @@
+from datetime import datetime, timezone
+
 import pytest
 from freezegun import freeze_time
 
-from utils.datetime import now
+from utils.datetime import JST, now, parse_epoch_ms, to_epoch_ms
 
 
 class TestNow(object):
@@ -16,3 +18,29 @@ class TestNow(object):
         with freeze_time(base):
             actual = now()
             assert str(actual) == str(expected)
+
+
+class TestToEpochMs(object):
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (datetime(1970, 1, 1, tzinfo=timezone.utc), 0),
+            (datetime(1970, 1, 1, 9, 0, 0, 1500, tzinfo=JST), 1),
+            (datetime(1970, 1, 1, 9, 0, 1), 1000),
+        ],
+    )
+    def test_normal(self, value, expected):
+        assert to_epoch_ms(value) == expected
+
+
+class TestParseEpochMs(object):
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2022-01-09 16:17:22.123456+09:00", 1641712642123),
+            ("2022-01-09 07:17:22.123456+00:00", 1641712642123),
+            ("2022-01-09 16:17:22", 1641712642000),
+        ],
+    )
+    def test_normal(self, text, expected):
+        assert parse_epoch_ms(text) == expected
@@ -0,0 +1,71 @@
+from io import BytesIO
+from typing import Dict, List
+
+import pytest
+
+from utils.feed import iter_rss_items
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+<title>E-Hentai Galleries</title>
+<link>https://e-hentai.org/</link>
+<description>Latest Galleries</description>
+<item>
+<title>[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi, Onii-chan</title>
+<link>https://e-hentai.org/g/2330808/37cfac63e0/</link>
+<description>parody:original, group:ins-mode, artist:amanagi seiji</description>
+<pubDate>Sat, 01 Oct 2022 00:00:00 +0000</pubDate>
+</item>
+<item>
+<title>[Manga] [Jの覚醒とWの本能]エッチな体験談告白投稿男塾より！[中国翻译]</title>
+<link>https://e-hentai.org/g/2330807/7e1d0dea77/</link>
+<description><![CDATA[language:chinese, language:translated &amp; more]]></description>
+</item>
+<item>
+<title>[Western] [Barretxiii] Barr&apos;s Mares</title>
+<link>https://e-hentai.org/g/2330745/b3d0811bea/</link>
+<description>artist:barretxiii, female:big breasts</description>
+</item>
+</channel>
+</rss>
+""".encode()
+
+
+class TestIterRssItems:
+    @pytest.mark.parametrize(
+        "body, chunk_size, expected",
+        [
+            (
+                FEED,
+                chunk_size,
+                [
+                    {
+                        "title": "[Doujinshi] (C100) [INS-mode (Amanagi Seiji)] Oyasumi, Onii-chan",
+                        "link": "https://e-hentai.org/g/2330808/37cfac63e0/",
+                        "summary": "parody:original, group:ins-mode, artist:amanagi seiji",
+                    },
+                    {
+                        "title": "[Manga] [Jの覚醒とWの本能]エッチな体験談告白投稿男塾より！[中国翻译]",
+                        "link": "https://e-hentai.org/g/2330807/7e1d0dea77/",
+                        "summary": "language:chinese, language:translated &amp; more",
+                    },
+                    {
+                        "title": "[Western] [Barretxiii] Barr's Mares",
+                        "link": "https://e-hentai.org/g/2330745/b3d0811bea/",
+                        "summary": "artist:barretxiii, female:big breasts",
+                    },
+                ],
+            )
+            for chunk_size in [7, 1024, 16 * 1024]
+        ],
+    )
+    def test_normal(self, body: bytes, chunk_size: int, expected: List[Dict[str, str]]):
+        actual = iter_rss_items(BytesIO(body), chunk_size)
+        assert list(actual) == expected
+
+    def test_lazy(self):
+        stream = BytesIO(FEED)
+        actual = iter_rss_items(stream, 512)
+        next(actual)
+        assert stream.tell() < len(FEED)
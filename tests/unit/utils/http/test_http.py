@@ -1,7 +1,16 @@
+from typing import Dict, List, Optional
+from urllib.error import HTTPError
+from urllib.request import Request
+
 import pytest
 from pytest import MonkeyPatch
 
-from utils.http import generate_get_http_client, http_get
+from utils.http import (
+    generate_get_http_client,
+    generate_host_limiter,
+    http_get,
+    http_open,
+)
 
 
 class DummyResponse:
@@ -36,3 +45,75 @@ class TestGenerateGetHttpClient:
         actual1 = client("https://google.com")
         assert actual0 == expected
         assert actual1 == expected
+
+
+class TestHttpOpen:
+    @pytest.mark.parametrize(
+        "response, headers, expected_headers",
+        [
+            (
+                DummyResponse("test"),
+                {"If-None-Match": '"abc"'},
+                {"If-none-match": '"abc"'},
+            ),
+            (DummyResponse("test"), None, {}),
+        ],
+    )
+    def test_normal(
+        self,
+        monkeypatch: MonkeyPatch,
+        response: DummyResponse,
+        headers: Optional[Dict[str, str]],
+        expected_headers: Dict[str, str],
+    ):
+        requests: List[Request] = []
+
+        def dummy(req: Request) -> DummyResponse:
+            requests.append(req)
+            return response
+
+        monkeypatch.setattr("utils.http.http.urlopen", dummy)
+        actual = http_open("https://google.com", headers)
+        assert actual == response
+        assert "User-agent" in requests[0].headers
+        for k, v in expected_headers.items():
+            assert requests[0].headers[k] == v
+
+    @pytest.mark.parametrize("code, expected", [(304, None)])
+    def test_not_modified(self, monkeypatch: MonkeyPatch, code: int, expected: None):
+        def dummy(req: Request):
+            raise HTTPError(req.full_url, code, "Not Modified", {}, None)
+
+        monkeypatch.setattr("utils.http.http.urlopen", dummy)
+        actual = http_open("https://google.com", {"If-None-Match": '"abc"'})
+        assert actual == expected
+
+    @pytest.mark.parametrize("code", [404, 500])
+    def test_exception(self, monkeypatch: MonkeyPatch, code: int):
+        def dummy(req: Request):
+            raise HTTPError(req.full_url, code, "Error", {}, None)
+
+        monkeypatch.setattr("utils.http.http.urlopen", dummy)
+        with pytest.raises(HTTPError):
+            http_open("https://google.com")
+
+
+class TestGenerateHostLimiter:
+    @pytest.mark.parametrize(
+        "url0, url1, expected",
+        [
+            ("https://e-hentai.org/a", "https://e-hentai.org/b", True),
+            ("https://e-hentai.org/a", "https://xml.e-hentai.org/ehg.xml", False),
+        ],
+    )
+    def test_normal(self, url0: str, url1: str, expected: bool):
+        limiter = generate_host_limiter(2)
+        actual = limiter(url0) is limiter(url1)
+        assert actual == expected
+
+    def test_limit(self):
+        limiter = generate_host_limiter(2)
+        semaphore = limiter("https://e-hentai.org/")
+        assert semaphore.acquire(blocking=False)
+        assert semaphore.acquire(blocking=False)
+        assert not semaphore.acquire(blocking=False)
@@ -0,0 +1,19 @@
+from typing import List
+
+import pytest
+from pytest import MonkeyPatch
+
+from utils.retry import sleep_with_backoff
+
+
+class TestSleepWithBackoff:
+    @pytest.mark.parametrize(
+        "attempt, expected",
+        [(0, 0.05), (1, 0.1), (3, 0.4), (10, 2.0)],
+    )
+    def test_normal(self, monkeypatch: MonkeyPatch, attempt: int, expected: float):
+        actual: List[float] = []
+        monkeypatch.setattr("utils.retry.retry.sleep", lambda x: actual.append(x))
+        monkeypatch.setattr("utils.retry.retry.uniform", lambda a, b: b)
+        sleep_with_backoff(attempt)
+        assert actual == [expected]
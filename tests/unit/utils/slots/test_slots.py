@@ -0,0 +1,31 @@
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+import pytest
+
+from utils.slots import add_slots
+
+
+@add_slots(extra=("cache",))
+@dataclass()
+class Sample:
+    name: str
+    values: List[int] = field(default_factory=list)
+    label: str = field(default="default")
+
+
+class TestAddSlots:
+    def test_normal(self):
+        actual = Sample(name="a")
+        actual.cache = 1
+
+        assert Sample.__slots__ == ("name", "values", "label", "cache")
+        assert not hasattr(actual, "__dict__")
+        assert asdict(actual) == {"name": "a", "values": [], "label": "default"}
+        assert actual == Sample(name="a")
+        assert Sample(name="a").values is not actual.values
+
+    def test_exception(self):
+        actual = Sample(name="a")
+        with pytest.raises(AttributeError):
+            actual.unknown = 1  # type: ignore